@@ -19,6 +19,8 @@ from planner.schedule import cmd_schedule_workouts, cmd_unschedule_workouts
 from planner.manage import cmd_list_scheduled, get_scheduled
 from planner.garmin_client import cmd_login, GarminClient
 from planner.license_manager import LicenseManager
+# Loader libyaml (se disponibile) e dumper senza alias condivisi con l'editor
+from workout_editor import SafeLoader, NoAliasDumper
 
 # Disabilita verifica SSL per risolvere problemi di connessione
 os.environ['PYTHONHTTPSVERIFY'] = '0'
@@ -2769,7 +2771,7 @@ class GarminPlannerGUI(tk.Tk):
             
             # Leggi il file YAML
             with open(yaml_file, 'r') as f:
-                plan_data = yaml.safe_load(f)
+                plan_data = yaml.load(f, Loader=SafeLoader)
             
             # Estrai l'ID del piano
             plan_id = ""
@@ -3975,7 +3977,7 @@ class GarminPlannerGUI(tk.Tk):
                         
                         try:
                             with open(os.path.join(root, file), 'r', encoding='utf-8') as f:
-                                yaml_data = yaml.safe_load(f)
+                                yaml_data = yaml.load(f, Loader=SafeLoader)
                                 if 'config' in yaml_data and 'sport_type' in yaml_data['config']:
                                     sport_type = yaml_data['config']['sport_type']
                         except Exception as e:
@@ -4053,7 +4055,7 @@ class GarminPlannerGUI(tk.Tk):
             
             # Leggi il file YAML
             with open(plan_path, 'r') as f:
-                plan_data = yaml.safe_load(f)
+                plan_data = yaml.load(f, Loader=SafeLoader)
                 
                 # Estrai l'ID del piano (name_prefix)
                 plan_id = ""
@@ -4158,7 +4160,7 @@ class GarminPlannerGUI(tk.Tk):
             self.log(f"Analisi piano da file YAML: {yaml_path}")
             
             with open(yaml_path, 'r') as f:
-                plan_data = yaml.safe_load(f)
+                plan_data = yaml.load(f, Loader=SafeLoader)
                 
                 # Estrai la data della gara se presente nella configurazione
                 config = plan_data.get('config', {})
@@ -4649,7 +4651,7 @@ class GarminPlannerGUI(tk.Tk):
             # Carica il file YAML per verificare la data della gara
             try:
                 with open(yaml_path, 'r') as f:
-                    plan_data = yaml.safe_load(f)
+                    plan_data = yaml.load(f, Loader=SafeLoader)
                     config = plan_data.get('config', {})
                     if 'race_day' in config:
                         original_race_day = config['race_day']
@@ -4730,7 +4732,7 @@ class GarminPlannerGUI(tk.Tk):
             if sport_type and yaml_path:
                 try:
                     with open(yaml_path, 'r') as f:
-                        yaml_data = yaml.safe_load(f)
+                        yaml_data = yaml.load(f, Loader=SafeLoader)
                     
                     # Aggiorna o aggiungi il tipo di sport nella configurazione
                     if 'config' not in yaml_data:
@@ -4893,7 +4895,7 @@ class GarminPlannerGUI(tk.Tk):
             if hasattr(self, 'current_yaml_path') and os.path.exists(self.current_yaml_path):
                 try:
                     with open(self.current_yaml_path, 'r') as f:
-                        yaml_data = yaml.safe_load(f)
+                        yaml_data = yaml.load(f, Loader=SafeLoader)
                         if 'config' in yaml_data and 'name_prefix' in yaml_data['config']:
                             name_prefix = yaml_data['config']['name_prefix']
                             self.log(f"Estratto name_prefix dal YAML: {name_prefix}")
@@ -5094,7 +5096,7 @@ class GarminPlannerGUI(tk.Tk):
             
             # Carica il file YAML
             with open(yaml_path, 'r') as f:
-                plan_data = yaml.safe_load(f)
+                plan_data = yaml.load(f, Loader=SafeLoader)
                 
                 # Rimuovi la configurazione
                 config = plan_data.pop('config', {})
@@ -5300,7 +5302,7 @@ class GarminPlannerGUI(tk.Tk):
                 # Verifica se il file contiene il piano
                 try:
                     with open(import_file, 'r', encoding='utf-8') as f:
-                        data = yaml.safe_load(f)
+                        data = yaml.load(f, Loader=SafeLoader)
                         if 'config' in data and 'name_prefix' in data['config']:
                             name_prefix = data['config']['name_prefix'].strip().lower()
                             
@@ -5346,7 +5348,7 @@ class GarminPlannerGUI(tk.Tk):
                                 # Controlla se il file contiene il piano
                                 try:
                                     with open(file_path, 'r', encoding='utf-8') as f:
-                                        data = yaml.safe_load(f)
+                                        data = yaml.load(f, Loader=SafeLoader)
                                         if 'config' in data and 'name_prefix' in data['config']:
                                             name_prefix = data['config']['name_prefix'].strip().lower()
                                             
@@ -5384,7 +5386,7 @@ class GarminPlannerGUI(tk.Tk):
                     # Verifica se contiene race_day
                     try:
                         with open(file_path, 'r', encoding='utf-8') as f:
-                            data = yaml.safe_load(f)
+                            data = yaml.load(f, Loader=SafeLoader)
                             if 'config' in data and 'race_day' in data['config']:
                                 race_day_str = data['config']['race_day']
                                 self.log(f"Trovata data della gara nel YAML: {race_day_str}")
@@ -5450,7 +5452,7 @@ class GarminPlannerGUI(tk.Tk):
         try:
             # Carica il file YAML
             with open(yaml_path, 'r') as f:
-                plan_data = yaml.safe_load(f)
+                plan_data = yaml.load(f, Loader=SafeLoader)
             
             # Aggiorna la data della gara
             if 'config' not in plan_data:
@@ -5712,7 +5714,7 @@ class GarminPlannerGUI(tk.Tk):
             if yaml_plan_loaded:
                 try:
                     with open(yaml_path, 'r') as f:
-                        plan_data = yaml.safe_load(f)
+                        plan_data = yaml.load(f, Loader=SafeLoader)
                         
                         # Estrai il tipo di sport dalla configurazione
                         config = plan_data.pop('config', {}) if 'config' in plan_data else {}
@@ -27,8 +27,14 @@ logging.basicConfig(
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
+# Usa il dumper C di libyaml se disponibile
+try:
+    from yaml import CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeDumper
+
 # Customize YAML dumper to avoid references/aliases
-class NoAliasDumper(yaml.SafeDumper):
+class NoAliasDumper(SafeDumper):
     """Custom YAML dumper that ignores aliases"""
     def ignore_aliases(self, data):
         return True
@@ -329,7 +335,7 @@ def format_steps_for_excel(steps, sport_type="running"):
             # Formatta i substeps con indentazione
             for substep in substeps:
                 if isinstance(substep, dict) and len(substep) == 1:
-                    substep_type = list(substep.keys())[0]
+                    substep_type = next(iter(substep))
                     substep_detail = substep[substep_type]
                     
                     # Gestisci i diversi formati in base al tipo di sport
@@ -347,7 +353,7 @@ def format_steps_for_excel(steps, sport_type="running"):
         
         elif isinstance(step, dict) and len(step) == 1:
             # Passo normale
-            step_type = list(step.keys())[0]
+            step_type = next(iter(step))
             step_detail = step[step_type]
             
             # Gestisci i diversi formati in base al tipo di sport
@@ -812,7 +818,7 @@ def format_steps_for_excel(steps, sport_type="running"):
             # Formatta i substeps con indentazione
             for substep in substeps:
                 if isinstance(substep, dict) and len(substep) == 1:
-                    substep_type = list(substep.keys())[0]
+                    substep_type = next(iter(substep))
                     substep_detail = substep[substep_type]
                     
                     # Gestisci i diversi formati in base al tipo di sport
@@ -830,7 +836,7 @@ def format_steps_for_excel(steps, sport_type="running"):
         
         elif isinstance(step, dict) and len(step) == 1:
             # Passo normale
-            step_type = list(step.keys())[0]
+            step_type = next(iter(step))
             step_detail = step[step_type]
             
             # Gestisci i diversi formati in base al tipo di sport
@@ -18,6 +18,15 @@ from planner.garmin_client import GarminClient
 from planner.constants import SPORT_TYPES
 from planner.utils import get_pace_range, ms_to_pace, pace_to_ms, dist_time_to_ms, get_speed_range, kmph_to_ms, ms_to_kmph
 
+# Use the libyaml C implementation when available
+try:
+    from yaml import CSafeLoader as SafeLoader
+except ImportError:
+    from yaml import SafeLoader
+
+# Matches "repeat N" step keys in workout files
+REPEAT_KEY_RE = re.compile(r'^repeat\s+(\d+)$')
+
 # Keys to remove when cleaning workout data for export
 CLEAN_KEYS = ['author', 'createdDate', 'ownerId', 'shared', 'updatedDate']
 
@@ -243,7 +252,7 @@ def import_workouts(plan_file, name_filter=None, sport_type="running"):
 
     with open(plan_file, 'r', encoding='utf-8') as file:
         workouts = []
-        import_json = yaml.safe_load(file)
+        import_json = yaml.load(file, Loader=SafeLoader)
 
         # Remove the config entry, if present
         global config
@@ -373,7 +382,9 @@ def fix_steps(steps):
             
         # Check for keys starting with 'repeat '
         for key in list(step.keys()):
-            repeat_match = re.match(r'^repeat\s+(\d+)$', key)
+            if not key.startswith('repeat'):
+                continue
+            repeat_match = REPEAT_KEY_RE.match(key)
             if repeat_match:
                 iterations = int(repeat_match.group(1))
                 substeps = step.pop(key)  # Remove the old key
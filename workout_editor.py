@@ -1,17 +1,38 @@
 #!/usr/bin/env python
 import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog, filedialog
+from tkinter import ttk, messagebox, simpledialog, filedialog, font as tkfont
 import os
 import yaml
 import re
-import copy
+import pickle
+import hashlib
 import logging
+import threading
 import openpyxl
-from functools import partial
-from planner.license_manager import LicenseManager
+from functools import partial, lru_cache
+from contextlib import contextmanager
+from collections import OrderedDict
+from types import MappingProxyType
+from planner.config import get_config
+
+# Usa le implementazioni C di libyaml quando disponibili
+try:
+    from yaml import CSafeLoader as SafeLoader, CSafeDumper as SafeDumper
+except ImportError:
+    from yaml import SafeLoader, SafeDumper
+
+
+class NoAliasDumper(SafeDumper):
+    """YAML dumper that never emits anchors/aliases for repeated objects"""
+    def ignore_aliases(self, data):
+        return True
+
+# Le sezioni in sola lettura di workout_config vengono salvate come normali dizionari
+NoAliasDumper.add_representer(MappingProxyType, NoAliasDumper.represent_dict)
+
 
-# Colori moderni (ispirati a Garmin Connect)
-COLORS = {
+# Colori moderni (ispirati a Garmin Connect), in sola lettura
+COLORS = MappingProxyType({
     "bg_main": "#f5f5f5",
     "bg_header": "#333333",
     "bg_light": "#ffffff",
@@ -26,10 +47,37 @@ COLORS = {
     "rest": "#98c1d9",     # Azzurro
     "repeat": "#5e548e",   # Viola
     "other": "#bdbdbd"     # Grigio
+})
+
+# Zone proposte quando la configurazione non ne definisce
+DEFAULT_PACE_ZONES = ("Z1", "Z2", "Z3", "Z4", "Z5", "6:00", "5:30", "5:00", "4:30", "4:00")
+DEFAULT_SPEED_ZONES = ("Z1", "Z2", "Z3", "Z4", "Z5", "15.0", "20.0", "25.0", "30.0", "35.0")
+DEFAULT_HR_ZONES = ("Z1_HR", "Z2_HR", "Z3_HR", "Z4_HR", "Z5_HR", "120-130", "130-140", "140-150", "150-160", "160-170")
+
+# Tipi di passo selezionabili nel dialogo
+STEP_TYPES = ("warmup", "interval", "recovery", "cooldown", "rest", "other")
+
+# Unità di misura dei passi (uguali per corsa e ciclismo) e sport disponibili
+STEP_UNITS = ("min", "km", "m", "lap-button")
+SPORT_TYPES = ("running", "cycling")
+
+# Nome mostrato nella lista degli allenamenti per ciascun tipo di sport
+SPORT_DISPLAY_NAMES = {sport: sport.capitalize() for sport in SPORT_TYPES}
+
+# Chiavi dei passi che contengono metadati dell'allenamento invece di un passo vero e proprio
+METADATA_KEYS = frozenset(("sport_type", "date"))
+
+# Unità proposta quando si sceglie un tipo di passo ("other" mantiene quella corrente)
+DEFAULT_STEP_UNITS = {
+    "warmup": "min",
+    "cooldown": "min",
+    "recovery": "min",
+    "interval": "m",
+    "rest": "min",
 }
 
-# Icone per i diversi tipi di passi (emoji Unicode)
-STEP_ICONS = {
+# Icone per i diversi tipi di passi (emoji Unicode), in sola lettura
+STEP_ICONS = MappingProxyType({
     "warmup": "🔥",     # Fiamma per riscaldamento
     "interval": "⚡",   # Fulmine per intervallo
     "recovery": "🌊",   # Onda per recupero
@@ -37,7 +85,179 @@ STEP_ICONS = {
     "rest": "⏸️",       # Pausa per riposo
     "repeat": "🔄",     # Frecce circolari per ripetizione
     "other": "📝"       # Note per altro
-}
+})
+
+# Valori di ripiego per i tipi di passo sconosciuti, risolti una volta sola
+DEFAULT_STEP_COLOR = COLORS["other"]
+DEFAULT_STEP_ICON = STEP_ICONS["other"]
+
+@lru_cache(maxsize=64)
+def lighten_color(hex_color):
+    """Rende più chiaro un colore hexadecimale mescolandolo con bianco"""
+    # Converte hex_color in un intero RGB a 24 bit
+    rgb = int(hex_color[1:], 16)
+    r = (rgb >> 16) & 0xFF
+    g = (rgb >> 8) & 0xFF
+    b = rgb & 0xFF
+    
+    # Mescola con bianco (255,255,255) con un rapporto 40/60, solo aritmetica intera
+    r = (r * 6 + 255 * 4) // 10
+    g = (g * 6 + 255 * 4) // 10
+    b = (b * 6 + 255 * 4) // 10
+    
+    # Converte in hex e restituisce
+    return f"#{r << 16 | g << 8 | b:06x}"
+
+# Versioni schiarite dei colori della palette, usate per l'elemento trascinato
+COLORS_LIGHT = {color: lighten_color(color) for color in COLORS.values()}
+
+# Misura di un passo, es. "10min", "1.5km", "400m"
+MEASURE_RE = re.compile(r'^([\d.]+)\s*(min|km|m)$')
+
+# Chiave di ripetizione nel formato YAML compatto, es. "repeat 5:"
+REPEAT_KEY_RE = re.compile(r'^repeat\s+(\d+):?$')
+# Durata o distanza numerica, ad esempio "10", "2.5" o ".5"
+NUMBER_RE = re.compile(r'^(?:\d+(?:\.\d*)?|\.\d+)$')
+# Dettaglio di un passo, ad esempio "10min @ Z1 -- Riscaldamento", "5km @spd 25.0" o "2min @hr Z2_HR"
+STEP_DETAIL_RE = re.compile(
+    r'^(?P<measure>.*?)'
+    r'(?: @(?P<kind>spd|hr|) (?P<zone>.*?))?'
+    r'(?: -- (?P<description>.*))?$',
+    re.DOTALL
+)
+
+def is_metadata_step(step):
+    """Return True if the step only holds workout metadata (sport type or date)"""
+    return isinstance(step, dict) and len(step) == 1 and next(iter(step)) in METADATA_KEYS
+
+@contextmanager
+def tree_frozen(tree):
+    """Hide the columns of a treeview while its rows are filled in bulk"""
+    # Senza colonne visibili Tk non ricalcola la visualizzazione a ogni riga inserita
+    columns = tree.cget('displaycolumns')
+    tree.configure(displaycolumns=())
+    try:
+        yield tree
+    finally:
+        tree.configure(displaycolumns=columns)
+
+def copy_steps(steps):
+    """Return a deep copy of a list of steps (plain YAML data)"""
+    # pickle è molto più veloce di copy.deepcopy per dati semplici e gestisce anche le date
+    return pickle.loads(pickle.dumps(steps, pickle.HIGHEST_PROTOCOL))
+
+def parse_measure(measure):
+    """Split a measure like "10min" into its value and unit (None if not recognized)"""
+    match = MEASURE_RE.match(measure)
+    if match:
+        return match.group(1), match.group(2)
+    return measure, None
+
+def normalize_steps(steps, nested=False):
+    """Convert the step formats accepted in YAML files into the ones used by the editor"""
+    processed_steps = []
+    for step in steps:
+        if isinstance(step, dict) and len(step) == 1 and isinstance(step[next(iter(step))], list):
+            step_type = next(iter(step))
+            substeps = normalize_steps(step[step_type], nested=True)
+            
+            # Formato "repeat N:" con i passi come valore; le liste del formato vecchio
+            # sotto un altro tipo sono passi da eseguire una volta sola
+            match = REPEAT_KEY_RE.match(step_type)
+            iterations = int(match.group(1)) if match else 1
+            
+            if nested:
+                # L'editor non gestisce ripetizioni annidate: espande i passi in linea
+                processed_steps.extend(substeps * iterations)
+            else:
+                processed_steps.append({'repeat': iterations, 'steps': substeps})
+        elif isinstance(step, dict) and 'repeat' in step and isinstance(step.get('steps'), list):
+            # Formato {'repeat': N, 'steps': [...]}, normalizza i passi interni
+            substeps = normalize_steps(step['steps'], nested=True)
+            if nested and isinstance(step['repeat'], int):
+                processed_steps.extend(substeps * step['repeat'])
+            else:
+                processed_steps.append({'repeat': step['repeat'], 'steps': substeps})
+        else:
+            processed_steps.append(step)
+    return processed_steps
+
+# File YAML già letti: percorso -> ((mtime, dimensione), dati), in ordine di utilizzo
+_YAML_CACHE = OrderedDict()
+_YAML_CACHE_SIZE = 100
+# I file vengono caricati anche da thread in background: la cache va protetta
+_YAML_CACHE_LOCK = threading.Lock()
+
+def load_yaml_file(path):
+    """Load a YAML file, reusing the parsed data while the file is unchanged"""
+    st = os.stat(path)
+    key = (st.st_mtime_ns, st.st_size)
+    
+    with _YAML_CACHE_LOCK:
+        cached = _YAML_CACHE.get(path)
+    
+    # Il parsing avviene fuori dal lock, così un file grande non blocca gli altri
+    if cached is None or cached[0] != key:
+        with open(path, 'rb') as f:
+            cached = (key, parse_yaml_cached(path, f.read()))
+    
+    with _YAML_CACHE_LOCK:
+        _YAML_CACHE[path] = cached
+        _YAML_CACHE.move_to_end(path)
+        if len(_YAML_CACHE) > _YAML_CACHE_SIZE:
+            _YAML_CACHE.popitem(last=False)
+    
+    # Il chiamante modifica i dati (config e passi), quindi restituisce sempre una copia
+    return copy_steps(cached[1])
+
+def parse_yaml_cached(path, raw):
+    """Parse YAML content, reusing the copy pickled in the cache directory if the content is unchanged"""
+    # Un file di cache per ogni file YAML, con l'hash del contenuto da cui è stato generato
+    digest = hashlib.blake2b(raw, digest_size=8).hexdigest()
+    path_hash = hashlib.blake2b(os.path.abspath(path).encode('utf-8'), digest_size=8).hexdigest()
+    cache_file = os.path.join(get_config().get_cache_dir(), f"yaml_{path_hash}.pickle")
+    
+    try:
+        with open(cache_file, 'rb') as f:
+            cached_digest, data = pickle.load(f)
+        if cached_digest == digest:
+            logging.debug(f"YAML caricato dalla cache: {path}")
+            return data
+    except FileNotFoundError:
+        pass
+    except Exception as e:
+        logging.warning(f"Error loading YAML cache file {cache_file}: {e}")
+    
+    data = yaml.load(raw, Loader=SafeLoader)
+    
+    try:
+        with open(cache_file, 'wb') as f:
+            pickle.dump((digest, data), f, pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        logging.warning(f"Error saving YAML cache file {cache_file}: {e}")
+    
+    return data
+
+def get_screen_size(widget):
+    """Return the screen size, asking the X server only once per application"""
+    root = widget._root()
+    size = getattr(root, '_screen_size', None)
+    if size is None:
+        size = root._screen_size = (widget.winfo_screenwidth(), widget.winfo_screenheight())
+    return size
+
+def center_on_screen(window, size=None):
+    """Center a window on screen"""
+    # Con la dimensione già nota non serve forzare il layout con update_idletasks
+    if size is None:
+        window.update_idletasks()
+        size = (window.winfo_width(), window.winfo_height())
+    width, height = size
+    screen_width, screen_height = get_screen_size(window)
+    x = (screen_width // 2) - (width // 2)
+    y = (screen_height // 2) - (height // 2)
+    # Solo la posizione: la dimensione resta quella già calcolata, senza un nuovo ridimensionamento
+    window.geometry(f"+{x}+{y}")
 
 workout_config = {
     'paces': {},
@@ -55,29 +275,48 @@ workout_config = {
     'sport_type': 'running'  # Default sport type
 }
 
+# Sezioni di workout_config che contengono dizionari
+CONFIG_SECTIONS = ('paces', 'speeds', 'heart_rates', 'margins')
+
+def freeze_workout_config():
+    """Make the dict sections of workout_config read-only, so they can be shared without copying"""
+    for section in CONFIG_SECTIONS:
+        value = workout_config.get(section)
+        if isinstance(value, dict):
+            workout_config[section] = MappingProxyType(dict(value))
+
+freeze_workout_config()
+
 class StepDialog(tk.Toplevel):
     """Dialog for adding/editing a workout step"""
     
-    def __init__(self, parent, step_type=None, step_detail=None, sport_type="running"):
+    # Dimensioni iniziali della finestra
+    _SIZE = (500, 300)
+    
+    def __init__(self, parent, step_type=None, step_detail=None, sport_type="running", reusable=False):
         super().__init__(parent)
         self.parent = parent
         self.result = None
         self.sport_type = sport_type
         
+        # Un dialogo riutilizzabile viene nascosto invece che distrutto alla chiusura,
+        # e mostrato di nuovo con show()
+        self.reusable = reusable
+        
         # Verifica se stiamo tentando di modificare un metadato
-        metadata_keys = ["sport_type", "date"]
-        if step_type in metadata_keys:
+        if step_type in METADATA_KEYS:
             messagebox.showinfo("Informazione", f"I metadati di tipo '{step_type}' non possono essere modificati in questa schermata.")
             self.destroy()
             return
         
         self.title("Dettagli del passo")
-        self.geometry("500x300")
+        self.geometry("%dx%d" % self._SIZE)
         self.configure(bg=COLORS["bg_light"])
         
         # Rendi la finestra modale
         self.transient(parent)
-        self.grab_set()
+        if not reusable:
+            self.grab_set()
         
         # Tipo di passo
         type_frame = ttk.Frame(self)
@@ -85,11 +324,10 @@ class StepDialog(tk.Toplevel):
         
         ttk.Label(type_frame, text="Tipo di passo:").grid(row=0, column=0, padx=5, pady=5)
         
-        step_types = ["warmup", "interval", "recovery", "cooldown", "rest", "other"]
-        self.step_type = tk.StringVar(value=step_type if step_type and step_type not in ["sport_type", "date"] else "interval")
+        self.step_type = tk.StringVar(value=step_type if step_type and step_type not in METADATA_KEYS else "interval")
         
         # Usa un combobox invece di dropdown
-        step_type_combo = ttk.Combobox(type_frame, textvariable=self.step_type, values=step_types, state="readonly", width=15)
+        step_type_combo = ttk.Combobox(type_frame, textvariable=self.step_type, values=STEP_TYPES, state="readonly", width=15)
         step_type_combo.grid(row=0, column=1, padx=5, pady=5)
         
         # Quando cambia il tipo, aggiorna l'interfaccia
@@ -105,20 +343,21 @@ class StepDialog(tk.Toplevel):
         
         ttk.Label(measure_frame, text="Durata/Distanza:").grid(row=0, column=0, padx=5, pady=5)
         self.measure_var = tk.StringVar()
-        self.measure_entry = ttk.Entry(measure_frame, textvariable=self.measure_var, width=10)
+        vcmd = (self.register(self.validate_measure), "%P")
+        self.measure_entry = ttk.Entry(measure_frame, textvariable=self.measure_var, width=10,
+                                       validate="key", validatecommand=vcmd)
         self.measure_entry.grid(row=0, column=1, padx=5, pady=5)
         
-        # Dropdown per unità (adattato per sport_type)
-        if sport_type == "cycling":
-            unit_values = ["min", "km", "m", "lap-button"]
-        else:  # running
-            unit_values = ["min", "km", "m", "lap-button"]
-            
+        # Dropdown per unità
         self.unit_var = tk.StringVar(value="min")
-        self.unit_combo = ttk.Combobox(measure_frame, textvariable=self.unit_var, values=unit_values, width=10, state="readonly")
+        self.unit_combo = ttk.Combobox(measure_frame, textvariable=self.unit_var, values=STEP_UNITS, width=10, state="readonly")
         self.unit_combo.grid(row=0, column=2, padx=5, pady=5)
         self.unit_combo.bind('<<ComboboxSelected>>', self.on_unit_change)
         
+        # Misura caricata ma non modificabile nel campo (non è un numero), ad esempio "1:30min"
+        self.measure_hint = ttk.Label(measure_frame, text="", font=("Arial", 8), foreground="gray")
+        self.measure_hint.grid(row=0, column=3, padx=5, pady=5, sticky=tk.W)
+        
         # Per la zona (ritmo o FC)
         zone_frame = ttk.Frame(detail_frame)
         zone_frame.pack(fill=tk.X, padx=5, pady=5)
@@ -131,22 +370,36 @@ class StepDialog(tk.Toplevel):
             
         self.zone_type = tk.StringVar(value="pace")
         ttk.Radiobutton(zone_frame, text=pace_label, variable=self.zone_type, value="pace", 
-                        command=self.update_zone_options).grid(row=0, column=0, padx=5, pady=5)
+                        command=self.on_zone_type_change).grid(row=0, column=0, padx=5, pady=5)
         ttk.Radiobutton(zone_frame, text="Frequenza Cardiaca", variable=self.zone_type, value="hr", 
-                        command=self.update_zone_options).grid(row=0, column=1, padx=5, pady=5)
+                        command=self.on_zone_type_change).grid(row=0, column=1, padx=5, pady=5)
         ttk.Radiobutton(zone_frame, text="Nessuna", variable=self.zone_type, value="none", 
-                        command=self.update_zone_options).grid(row=0, column=2, padx=5, pady=5)
+                        command=self.on_zone_type_change).grid(row=0, column=2, padx=5, pady=5)
         
         # Frame per le opzioni della zona
         self.zone_options_frame = ttk.Frame(detail_frame)
         self.zone_options_frame.pack(fill=tk.X, padx=5, pady=5)
         
-        # Lista vuota per i valori di zona
+        # Zone disponibili e simbolo per tipo di zona, calcolati una volta sola
+        # (la configurazione non cambia mentre il dialogo è aperto)
+        if sport_type == "cycling":
+            pace_zones = tuple(workout_config.get('speeds', {})) or DEFAULT_SPEED_ZONES
+            pace_prefix = "@spd"
+        else:  # running
+            pace_zones = tuple(workout_config.get('paces', {})) or DEFAULT_PACE_ZONES
+            pace_prefix = "@"
+        self._zone_options = {
+            "pace": (pace_zones, pace_prefix),
+            "hr": (tuple(workout_config.get('heart_rates', {})) or DEFAULT_HR_ZONES, "@hr"),
+        }
+        
+        # Combobox e simbolo della zona, creati una volta e aggiornati al cambio del tipo di zona
         self.zone_var = tk.StringVar()
         self.zone_combo = ttk.Combobox(self.zone_options_frame, textvariable=self.zone_var, width=15)
-        self.zone_combo.pack(side=tk.LEFT, padx=5)
+        self.zone_prefix_label = ttk.Label(self.zone_options_frame)
         
         # Aggiornamento delle opzioni di zona
+        self._shown_zone_type = None
         self.update_zone_options()
         
         # Descrizione (opzionale)
@@ -163,6 +416,13 @@ class StepDialog(tk.Toplevel):
         ttk.Button(button_frame, text="OK", command=self.on_ok).pack(side=tk.LEFT, padx=5)
         ttk.Button(button_frame, text="Annulla", command=self.on_cancel).pack(side=tk.LEFT, padx=5)
         
+        if reusable:
+            # Resta nascosto fino alla prima chiamata a show()
+            self._closed = tk.BooleanVar(value=True)
+            self.protocol("WM_DELETE_WINDOW", self.on_cancel)
+            self.withdraw()
+            return
+        
         # Se abbiamo dei dettagli, popola i campi
         if step_detail:
             self.populate_from_detail(step_detail)
@@ -173,14 +433,49 @@ class StepDialog(tk.Toplevel):
         # Attendi che la finestra sia chiusa
         self.wait_window()
     
+    def reset(self, step_type=None, step_detail=None):
+        """Reset all fields for a new step"""
+        self.result = None
+        self.step_type.set(step_type if step_type else "interval")
+        self.measure_var.set("")
+        self.measure_hint.configure(text="")
+        self.measure_entry.configure(state="normal")
+        self.unit_var.set("min")
+        self.zone_type.set("pace")
+        self.description_var.set("")
+        self.update_zone_options()
+        
+        if step_detail:
+            self.populate_from_detail(step_detail)
+    
+    def show(self, step_type=None, step_detail=None):
+        """Show a reusable dialog for the given step and return the result"""
+        if step_type in METADATA_KEYS:
+            messagebox.showinfo("Informazione", f"I metadati di tipo '{step_type}' non possono essere modificati in questa schermata.")
+            return None
+        
+        self.reset(step_type, step_detail)
+        self.deiconify()
+        self.center_window()
+        self.grab_set()
+        
+        # Attendi che la finestra sia nascosta
+        self._closed.set(False)
+        self.wait_variable(self._closed)
+        return self.result
+    
+    def close(self):
+        """Close the dialog (hide it if reusable)"""
+        if self.reusable:
+            self.grab_release()
+            self.withdraw()
+            self._closed.set(True)
+        else:
+            self.destroy()
+    
     def center_window(self):
         """Center the window on screen"""
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = (self.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f"{width}x{height}+{x}+{y}")
+        center_on_screen(self, self._SIZE)
     
     def on_type_change(self, event):
         """Handle step type change"""
@@ -188,25 +483,24 @@ class StepDialog(tk.Toplevel):
         step_type = self.step_type.get()
         
         # Verifica se è un metadato
-        metadata_keys = ["sport_type", "date"]
-        if step_type in metadata_keys:
+        if step_type in METADATA_KEYS:
             messagebox.showinfo("Informazione", f"I metadati di tipo '{step_type}' non possono essere selezionati.")
             # Reimposta il tipo a un valore accettabile
             self.step_type.set("interval")
             return
         
         # Aggiorna le unità di default
-        if step_type in ["warmup", "cooldown", "recovery"]:
-            self.unit_var.set("min")
-        elif step_type == "interval":
-            self.unit_var.set("m")
-        elif step_type == "rest":
-            # Per i passi di riposo, mostra anche lap-button come opzione
-            self.unit_var.set("min")
+        default_unit = DEFAULT_STEP_UNITS.get(step_type)
+        if default_unit:
+            self.unit_var.set(default_unit)
         
     def on_unit_change(self, event):
         """Handle unit change"""
         if self.unit_var.get() == "lap-button":
+            # Già in modalità lap-button: niente da aggiornare
+            if self.measure_entry.instate(["disabled"]) and self.zone_type.get() == "none":
+                return
+            
             # Disabilita il campo misura
             self.measure_var.set("")
             self.measure_entry.configure(state="disabled")
@@ -217,81 +511,33 @@ class StepDialog(tk.Toplevel):
             # Riabilita il campo misura
             self.measure_entry.configure(state="normal")
     
+    def on_zone_type_change(self):
+        """Handle a click on the zone type radio buttons"""
+        # Un clic sul tipo di zona già selezionato non cambia nulla
+        if self.zone_type.get() != self._shown_zone_type:
+            self.update_zone_options()
+    
     def update_zone_options(self):
         """Update zone options based on the selected zone type"""
         zone_type = self.zone_type.get()
+        self._shown_zone_type = zone_type
         
-        # Pulisci le opzioni correnti
-        for widget in self.zone_options_frame.winfo_children():
-            widget.destroy()
-        
-        if zone_type == "pace":
-            if self.sport_type == "cycling":
-                # Carica le opzioni per la velocità dal config globale
-                speed_zones = list(workout_config.get('speeds', {}).keys())
-                
-                # Se non ci sono zone definite, usa le predefinite
-                if not speed_zones:
-                    speed_zones = ["Z1", "Z2", "Z3", "Z4", "Z5", "15.0", "20.0", "25.0", "30.0", "35.0"]
-                
-                self.zone_var = tk.StringVar()
-                self.zone_combo = ttk.Combobox(self.zone_options_frame, textvariable=self.zone_var, values=speed_zones, width=15)
-                self.zone_combo.pack(side=tk.LEFT, padx=5)
-                
-                # Aggiungi simbolo @spd per velocità
-                ttk.Label(self.zone_options_frame, text="@spd").pack(side=tk.LEFT)
-                
-                # Il primo valore come default
-                if speed_zones:
-                    self.zone_var.set(speed_zones[0])
-            else:  # running
-                # Carica le opzioni per il ritmo dal config globale
-                pace_zones = list(workout_config.get('paces', {}).keys())
-                
-                # Se non ci sono zone definite, usa le predefinite
-                if not pace_zones:
-                    pace_zones = ["Z1", "Z2", "Z3", "Z4", "Z5", "6:00", "5:30", "5:00", "4:30", "4:00"]
-                
-                self.zone_var = tk.StringVar()
-                self.zone_combo = ttk.Combobox(self.zone_options_frame, textvariable=self.zone_var, values=pace_zones, width=15)
-                self.zone_combo.pack(side=tk.LEFT, padx=5)
-                
-                # Aggiungi simbolo @
-                ttk.Label(self.zone_options_frame, text="@").pack(side=tk.LEFT)
-                
-                # Il primo valore come default
-                if pace_zones:
-                    self.zone_var.set(pace_zones[0])
-                
-        elif zone_type == "hr":
-            # Carica le opzioni per la frequenza cardiaca dal config globale
-            hr_zones = list(workout_config.get('heart_rates', {}).keys())
-            
-            # Aggiungi anche le versioni senza _HR per le zone che hanno il suffisso
-            hr_zones_without_suffix = []
-            for zone in hr_zones:
-                if zone.endswith("_HR"):
-                    hr_zones_without_suffix.append(zone)
-                    # hr_zones_without_suffix.append(zone.replace("_HR", ""))
+        if zone_type in self._zone_options:
+            zones, prefix = self._zone_options[zone_type]
+            self.zone_combo.configure(values=zones)
+            self.zone_prefix_label.configure(text=prefix)
             
-            # Se non ci sono zone definite, usa le predefinite
-            if not hr_zones:
-                hr_zones = ["Z1_HR", "Z2_HR", "Z3_HR", "Z4_HR", "Z5_HR", "120-130", "130-140", "140-150", "150-160", "160-170"]
-            
-            self.zone_var = tk.StringVar()
-            self.zone_combo = ttk.Combobox(self.zone_options_frame, textvariable=self.zone_var, values=hr_zones, width=15)
-            self.zone_combo.pack(side=tk.LEFT, padx=5)
-            
-            # Aggiungi simbolo @hr
-            ttk.Label(self.zone_options_frame, text="@hr").pack(side=tk.LEFT)
+            # Mostra la combobox e il simbolo se erano nascosti
+            if not self.zone_combo.winfo_manager():
+                self.zone_combo.pack(side=tk.LEFT, padx=5)
+                self.zone_prefix_label.pack(side=tk.LEFT)
             
             # Il primo valore come default
-            if hr_zones:
-                self.zone_var.set(hr_zones[0])
-        
+            self.zone_var.set(zones[0])
         else:  # none - nessuna zona
             # Non mostrare opzioni di zona
-            pass
+            self.zone_combo.pack_forget()
+            self.zone_prefix_label.pack_forget()
             
         # Gestione speciale per lap-button
         if self.unit_var.get() == "lap-button":
@@ -302,175 +548,57 @@ class StepDialog(tk.Toplevel):
 
     def populate_from_detail(self, detail):
         """Populate fields from step detail"""
-        # Handle case where detail is a list (old format)
-        if isinstance(detail, list):
-            self.measure_var.set("1")  # Default value
-            self.unit_var.set("min")   # Default unit
-            self.zone_type.set("pace") # Default zone type
-            self.zone_var.set("Z2")    # Default zone
-            return
+        # Esempio: "10min @ Z1 -- Riscaldamento iniziale"
+        match = STEP_DETAIL_RE.match(detail)
+        description = match.group('description')
+        if description:
+            self.description_var.set(description.strip())
         
         # Caso speciale per lap-button
-        if detail == "lap-button" or detail.startswith("lap-button"):
+        if detail.startswith("lap-button"):
             self.unit_var.set("lap-button")
             self.measure_var.set("")
             self.measure_entry.configure(state="disabled")
             self.zone_type.set("none")
-            
-            # Estrai eventuale descrizione
-            if " -- " in detail:
-                _, description = detail.split(" -- ", 1)
-                self.description_var.set(description.strip())
-            
             self.update_zone_options()
             return
         
-        # Gestione @spd per velocità (cycling)
-        if " @spd " in detail:
-            parts = detail.split(" @spd ", 1)
-            measure = parts[0].strip()
-            zone = parts[1].strip()
-            
-            # Estrai descrizione se presente
-            if " -- " in zone:
-                zone, description = zone.split(" -- ", 1)
-                self.description_var.set(description.strip())
-            
-            # Imposta il tipo di zona a pace
-            self.zone_type.set("pace")
-            
-            # Aggiorna le opzioni di zona
-            self.update_zone_options()
-            
-            # Imposta la zona
-            self.zone_var.set(zone.strip())
-            
-            # Estrai la misura e l'unità
-            measure = measure.strip()
-            if "min" in measure:
-                value = measure.replace("min", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("min")
-            elif "km" in measure:
-                value = measure.replace("km", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("km")
-            elif "m" in measure:
-                value = measure.replace("m", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("m")
-            else:
-                self.measure_var.set(measure)
-            
-            return
-            
-        # Gestione @hr per frequenza cardiaca
-        if " @hr " in detail:
-            parts = detail.split(" @hr ", 1)
-            measure = parts[0].strip()
-            zone = parts[1].strip()
-            
-            # Estrai descrizione se presente
-            if " -- " in zone:
-                zone, description = zone.split(" -- ", 1)
-                self.description_var.set(description.strip())
-            
-            # Imposta il tipo di zona a frequenza cardiaca
-            self.zone_type.set("hr")
-            
-            # Aggiorna le opzioni di zona
-            self.update_zone_options()
-            
-            # Imposta la zona
-            self.zone_var.set(zone.strip())
-            
-            # Estrai la misura e l'unità
-            measure = measure.strip()
-            if "min" in measure:
-                value = measure.replace("min", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("min")
-            elif "km" in measure:
-                value = measure.replace("km", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("km")
-            elif "m" in measure:
-                value = measure.replace("m", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("m")
-            else:
-                self.measure_var.set(measure)
-            
-            return
-        
-        # Esempio: "10min @ Z1 -- Riscaldamento iniziale"
-        
-        # Cerca la descrizione
-        if " -- " in detail:
-            parts = detail.split(" -- ")
-            main_part = parts[0].strip()
-            description = parts[1].strip()
-            self.description_var.set(description)
+        # Estrai la misura e l'unità
+        measure = match.group('measure').strip()
+        value, unit = parse_measure(measure)
+        if unit:
+            self.unit_var.set(unit)
+        if NUMBER_RE.match(value):
+            self.measure_var.set(value)
         else:
-            main_part = detail.strip()
+            # Il campo accetta solo numeri: un valore non riconosciuto non potrebbe essere
+            # corretto carattere per carattere, quindi resta vuoto e la misura originale
+            # viene mostrata accanto
+            self.measure_var.set("")
+            self.measure_hint.configure(text=f"Non riconosciuta: {measure}")
         
-        # Cerca la misura e la zona
-        if " @ " in main_part:
-            measure, zone = main_part.split(" @ ", 1)
-            
-            # Identifica se è HR o pace basato sul suffisso _HR
-            if "_HR" in zone:
-                self.zone_type.set("hr")
-            else:
-                self.zone_type.set("pace")
-            
-            # Prima aggiorna le opzioni di zona in base al tipo (hr o pace)
-            self.update_zone_options()
-            
-            # Ora imposta il valore della zona (dopo che le opzioni sono state aggiornate)
-            self.zone_var.set(zone.strip())
-            
-            # Estrai la misura e l'unità
-            measure = measure.strip()
-            if "min" in measure:
-                value = measure.replace("min", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("min")
-            elif "km" in measure:
-                value = measure.replace("km", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("km")
-            elif "m" in measure:
-                value = measure.replace("m", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("m")
-            else:
-                self.measure_var.set(measure)
-        else:
+        zone = match.group('zone')
+        kind = match.group('kind')
+        if zone is None:
             # Nessuna zona specificata
             self.zone_type.set("none")
-            
-            # Estrai solo la misura e l'unità
-            measure = main_part.strip()
-            if "min" in measure:
-                value = measure.replace("min", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("min")
-            elif "km" in measure:
-                value = measure.replace("km", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("km")
-            elif "m" in measure:
-                value = measure.replace("m", "").strip()
-                self.measure_var.set(value)
-                self.unit_var.set("m")
-            else:
-                self.measure_var.set(measure)
-            
-            # Aggiorna la UI
-            self.update_zone_options()
+        elif kind == "hr" or (kind == "" and "_HR" in zone):
+            # @hr, oppure @ con una zona con suffisso _HR
+            self.zone_type.set("hr")
+        else:
+            # @ per il ritmo, @spd per la velocità (cycling)
+            self.zone_type.set("pace")
+        
+        # Prima aggiorna le opzioni di zona in base al tipo, poi imposta il valore della zona
+        self.update_zone_options()
+        if zone is not None:
+            self.zone_var.set(zone.strip())
 
 
+    def validate_measure(self, value):
+        """Allow only an empty field or a partial decimal number while typing"""
+        return value == "" or value == "." or NUMBER_RE.match(value) is not None
+    
     def on_ok(self):
         """Handle OK button click"""
         # Caso speciale per lap-button
@@ -483,7 +611,7 @@ class StepDialog(tk.Toplevel):
                 
             # Imposta il risultato
             self.result = (self.step_type.get(), detail)
-            self.destroy()
+            self.close()
             return
         
         # Valida i dati
@@ -491,25 +619,19 @@ class StepDialog(tk.Toplevel):
             messagebox.showerror("Errore", "Inserisci una durata o distanza", parent=self)
             return
         
-        try:
-            # Verifica che la misura sia un numero
-            float(self.measure_var.get())
-        except ValueError:
+        # Verifica che la misura sia un numero
+        if not NUMBER_RE.match(self.measure_var.get()):
             messagebox.showerror("Errore", "La durata o distanza deve essere un numero", parent=self)
             return
         
         # Costruisci il dettaglio del passo
         measure = f"{self.measure_var.get()}{self.unit_var.get()}"
         
-        if self.zone_type.get() == "hr":
-            zone = f"@hr {self.zone_var.get()}"
-            detail = f"{measure} {zone}"
-        elif self.zone_type.get() == "pace":
-            if self.sport_type == "cycling":
-                zone = f"@spd {self.zone_var.get()}"
-            else:  # running
-                zone = f"@ {self.zone_var.get()}"
-            detail = f"{measure} {zone}"
+        zone_options = self._zone_options.get(self.zone_type.get())
+        if zone_options:
+            # @ per il ritmo, @spd per la velocità, @hr per la frequenza cardiaca
+            _, prefix = zone_options
+            detail = f"{measure} {prefix} {self.zone_var.get()}"
         else:
             # No zone
             detail = measure
@@ -522,24 +644,77 @@ class StepDialog(tk.Toplevel):
         self.result = (self.step_type.get(), detail)
         
         # Chiudi la finestra
-        self.destroy()
+        self.close()
     
 
     
     def on_cancel(self):
         """Handle Cancel button click"""
-        self.destroy()
+        self.close()
+
+
+# Nomi delle voci di ogni sezione con coppie nome/valore: (nei titoli, nei messaggi)
+CONFIG_ITEM_NAMES = {
+    'paces': ("Ritmo", "ritmo"),
+    'speeds': ("Velocità", "velocità"),
+    'heart_rates': ("Frequenza Cardiaca", "frequenza cardiaca"),
+}
 
+# Testo di aiuto di ConfigItemDialog per ogni sezione
+CONFIG_ITEM_HELP = {
+    'paces': """
+            Esempi di formati validi per ritmi (corsa):
+            
+            - '5:30-5:10' (intervallo di ritmo)
+            - '10km in 45:00' (distanza in tempo)
+            - '80-85% marathon' (percentuale di un altro ritmo)
+            - '5:30' (ritmo singolo)
+            """,
+    'speeds': """
+            Esempi di formati validi per velocità (ciclismo):
+            
+            - '25-30' (intervallo di velocità in km/h)
+            - '30.0' (velocità singola in km/h)
+            - '80-90% ftp' (percentuale di un'altra velocità)
+            - '25 km/h' (velocità con unità di misura)
+            """,
+    'heart_rates': """
+            Esempi di formati validi per frequenze cardiache:
+            
+            - '150-160' (intervallo di battiti)
+            - '70-76% max_hr' (percentuale di FC massima)
+            - '160' (valore singolo)
+            """,
+}
 
 class ConfigEditorDialog(tk.Toplevel):
     """Dialog for editing paces, heart rates, speeds, and other configuration options"""
     
+    # Dimensioni iniziali della finestra
+    _SIZE = (800, 600)
+    
+    # Testi informativi delle schede
+    _SPEEDS_INFO = "Specifica le velocità in km/h. Puoi inserire un valore singolo (es. '30.0') o un intervallo (es. '25.0-35.0')."
+    
+    _MARGINS_HELP = ("Queste impostazioni controllano i margini di tolleranza per ritmi, velocità e frequenze cardiache.\n\n"
+                     "Per la corsa: un margine di '0:03' permette di correre fino a 3 secondi più veloce o più lento\n"
+                     "rispetto al ritmo target.\n\n"
+                     "Per il ciclismo: un margine di '2.0' permette di pedalare fino a 2 km/h più veloce o più lento\n"
+                     "rispetto alla velocità target.\n\n"
+                     "Per la frequenza cardiaca: una tolleranza di 5 bpm permette variazioni di 5 battiti\n"
+                     "sopra o sotto il target impostato.")
+    
+    _GENERAL_HELP = ("Queste impostazioni controllano il tipo di sport predefinito per i nuovi allenamenti.\n\n"
+                     "Running: utilizza ritmi espressi in min/km\n"
+                     "Cycling: utilizza velocità espresse in km/h\n\n"
+                     "Il prefisso nome viene aggiunto automaticamente a tutti gli allenamenti generati.")
+    
     def __init__(self, parent):
         super().__init__(parent)
         self.parent = parent
         
         self.title("Configurazione Allenamenti")
-        self.geometry("800x600")
+        self.geometry("%dx%d" % self._SIZE)
         self.configure(bg=COLORS["bg_light"])
         
         # Rendi la finestra modale
@@ -570,12 +745,22 @@ class ConfigEditorDialog(tk.Toplevel):
         self.general_frame = ttk.Frame(self.notebook)
         self.notebook.add(self.general_frame, text="Generale")
         
-        # Inizializza le schede
-        self.init_paces_tab()
-        self.init_speeds_tab()
-        self.init_hr_tab()
-        self.init_margins_tab()
-        self.init_general_tab()
+        # Le schede vengono costruite e riempite alla prima selezione:
+        # frame della scheda -> (costruzione, caricamento dei dati)
+        self._tab_builders = {
+            str(self.paces_frame): (self.init_paces_tab, self.load_paces_data),
+            str(self.speeds_frame): (self.init_speeds_tab, self.load_speeds_data),
+            str(self.hr_frame): (self.init_hr_tab, self.load_hr_data),
+            str(self.margins_frame): (self.init_margins_tab, self.load_margins_data),
+            str(self.general_frame): (self.init_general_tab, self.load_general_data),
+        }
+        self._built_tabs = set()
+        
+        # Treeview delle sezioni con coppie nome/valore, create con le rispettive schede,
+        # e le loro righe in Python (sezione -> {iid: (nome, valore)}), nello stesso ordine
+        self._trees = {}
+        self._rows = {}
+        self.notebook.bind("<<NotebookTabChanged>>", self.ensure_tab_built)
         
         # Bottoni
         button_frame = ttk.Frame(self)
@@ -584,51 +769,22 @@ class ConfigEditorDialog(tk.Toplevel):
         ttk.Button(button_frame, text="OK", command=self.on_ok).pack(side=tk.RIGHT, padx=5)
         ttk.Button(button_frame, text="Annulla", command=self.on_cancel).pack(side=tk.RIGHT, padx=5)
         
+        # Costruisce la scheda visibile prima di mostrare la finestra, così viene misurata una volta sola
+        self.ensure_tab_built()
+        
         # Centra la finestra
         self.center_window()
         
-        # Carica i dati
-        self.load_data()
-        
         # Attendi la chiusura della finestra
         self.wait_window()
     
 
     def init_speeds_tab(self):
         """Initialize the speeds tab for cycling"""
-        # Frame per la lista
-        list_frame = ttk.Frame(self.speeds_frame)
-        list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Crea la treeview
-        self.speeds_tree = ttk.Treeview(list_frame, columns=("name", "value"), show="headings")
-        self.speeds_tree.heading("name", text="Nome")
-        self.speeds_tree.heading("value", text="Valore (km/h)")
-        self.speeds_tree.column("name", width=150)
-        self.speeds_tree.column("value", width=250)
-        
-        # Aggiungi scrollbar
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.speeds_tree.yview)
-        self.speeds_tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Packing
-        self.speeds_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Bottoni
-        button_frame = ttk.Frame(self.speeds_frame)
-        button_frame.pack(fill=tk.X, padx=5, pady=5)
-        
-        ttk.Button(button_frame, text="Aggiungi", command=lambda: self.add_item('speeds')).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Modifica", command=lambda: self.edit_item('speeds')).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Elimina", command=lambda: self.delete_item('speeds')).pack(side=tk.LEFT, padx=5)
-        
-        # Double-click to edit
-        self.speeds_tree.bind("<Double-1>", lambda e: self.edit_item('speeds'))
+        self.speeds_tree = self.build_kv_tab(self.speeds_frame, 'speeds', "Valore (km/h)")
         
         # Aggiungi una label informativa
-        info_text = "Specifica le velocità in km/h. Puoi inserire un valore singolo (es. '30.0') o un intervallo (es. '25.0-35.0')."
-        ttk.Label(self.speeds_frame, text=info_text, wraplength=600).pack(pady=5)
+        ttk.Label(self.speeds_frame, text=self._SPEEDS_INFO, wraplength=600).pack(pady=5)
 
 
     def init_general_tab(self):
@@ -640,7 +796,7 @@ class ConfigEditorDialog(tk.Toplevel):
         # Sport type
         ttk.Label(grid_frame, text="Tipo di sport:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
         self.sport_type_var = tk.StringVar(value="running")  # Default to running
-        sport_combo = ttk.Combobox(grid_frame, textvariable=self.sport_type_var, values=["running", "cycling"], state="readonly", width=15)
+        sport_combo = ttk.Combobox(grid_frame, textvariable=self.sport_type_var, values=SPORT_TYPES, state="readonly", width=15)
         sport_combo.grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
         
         # Name prefix
@@ -649,87 +805,56 @@ class ConfigEditorDialog(tk.Toplevel):
         ttk.Entry(grid_frame, textvariable=self.name_prefix_var, width=40).grid(row=1, column=1, columnspan=3, padx=5, pady=5, sticky=tk.W+tk.E)
         
         # Help text
-        help_text = ("Queste impostazioni controllano il tipo di sport predefinito per i nuovi allenamenti.\n\n"
-                     "Running: utilizza ritmi espressi in min/km\n"
-                     "Cycling: utilizza velocità espresse in km/h\n\n"
-                     "Il prefisso nome viene aggiunto automaticamente a tutti gli allenamenti generati.")
-        
-        ttk.Label(grid_frame, text=help_text, wraplength=600, justify=tk.LEFT).grid(row=2, column=0, columnspan=4, padx=5, pady=15, sticky=tk.W)
+        ttk.Label(grid_frame, text=self._GENERAL_HELP, wraplength=600, justify=tk.LEFT).grid(row=2, column=0, columnspan=4, padx=5, pady=15, sticky=tk.W)
 
 
 
     def center_window(self):
         """Center the window on screen"""
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = (self.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f"{width}x{height}+{x}+{y}")
+        center_on_screen(self, self._SIZE)
     
-    def init_paces_tab(self):
-        """Initialize the paces tab"""
+    def build_kv_tab(self, parent, section, value_header):
+        """Build the name/value list of a config section with its buttons and return the treeview"""
         # Frame per la lista
-        list_frame = ttk.Frame(self.paces_frame)
+        list_frame = ttk.Frame(parent)
         list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Crea la treeview
-        self.paces_tree = ttk.Treeview(list_frame, columns=("name", "value"), show="headings")
-        self.paces_tree.heading("name", text="Nome")
-        self.paces_tree.heading("value", text="Valore")
-        self.paces_tree.column("name", width=150)
-        self.paces_tree.column("value", width=250)
+        tree = ttk.Treeview(list_frame, columns=("name", "value"), show="headings")
+        tree.heading("name", text="Nome")
+        tree.heading("value", text=value_header)
+        tree.column("name", width=150)
+        tree.column("value", width=250)
+        self._trees[section] = tree
         
         # Aggiungi scrollbar
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.paces_tree.yview)
-        self.paces_tree.configure(yscrollcommand=scrollbar.set)
+        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=tree.yview)
+        tree.configure(yscrollcommand=scrollbar.set)
         
         # Packing
-        self.paces_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
         # Bottoni
-        button_frame = ttk.Frame(self.paces_frame)
+        button_frame = ttk.Frame(parent)
         button_frame.pack(fill=tk.X, padx=5, pady=5)
         
-        ttk.Button(button_frame, text="Aggiungi", command=lambda: self.add_item('paces')).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Modifica", command=lambda: self.edit_item('paces')).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Elimina", command=lambda: self.delete_item('paces')).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Aggiungi", command=partial(self.add_item, section)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Modifica", command=partial(self.edit_item, section)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(button_frame, text="Elimina", command=partial(self.delete_item, section)).pack(side=tk.LEFT, padx=5)
         
         # Double-click to edit
-        self.paces_tree.bind("<Double-1>", lambda e: self.edit_item('paces'))
+        tree.bind("<Double-1>", lambda e: self.edit_item(section))
+        
+        return tree
+    
+    def init_paces_tab(self):
+        """Initialize the paces tab"""
+        self.paces_tree = self.build_kv_tab(self.paces_frame, 'paces', "Valore")
     
     def init_hr_tab(self):
         """Initialize the heart rates tab"""
-        # Frame per la lista
-        list_frame = ttk.Frame(self.hr_frame)
-        list_frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
-        
-        # Crea la treeview
-        self.hr_tree = ttk.Treeview(list_frame, columns=("name", "value"), show="headings")
-        self.hr_tree.heading("name", text="Nome")
-        self.hr_tree.heading("value", text="Valore")
-        self.hr_tree.column("name", width=150)
-        self.hr_tree.column("value", width=250)
-        
-        # Aggiungi scrollbar
-        scrollbar = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.hr_tree.yview)
-        self.hr_tree.configure(yscrollcommand=scrollbar.set)
-        
-        # Packing
-        self.hr_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        
-        # Bottoni
-        button_frame = ttk.Frame(self.hr_frame)
-        button_frame.pack(fill=tk.X, padx=5, pady=5)
-        
-        ttk.Button(button_frame, text="Aggiungi", command=lambda: self.add_item('heart_rates')).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Modifica", command=lambda: self.edit_item('heart_rates')).pack(side=tk.LEFT, padx=5)
-        ttk.Button(button_frame, text="Elimina", command=lambda: self.delete_item('heart_rates')).pack(side=tk.LEFT, padx=5)
-        
-        # Double-click to edit
-        self.hr_tree.bind("<Double-1>", lambda e: self.edit_item('heart_rates'))
+        self.hr_tree = self.build_kv_tab(self.hr_frame, 'heart_rates', "Valore")
     
 
     def init_margins_tab(self):
@@ -778,34 +903,38 @@ class ConfigEditorDialog(tk.Toplevel):
         ttk.Entry(grid_frame, textvariable=self.hr_down_var, width=10).grid(row=4, column=3, padx=5, pady=5, sticky=tk.W)
         
         # Help text
-        help_text = ("Queste impostazioni controllano i margini di tolleranza per ritmi, velocità e frequenze cardiache.\n\n"
-                     "Per la corsa: un margine di '0:03' permette di correre fino a 3 secondi più veloce o più lento\n"
-                     "rispetto al ritmo target.\n\n"
-                     "Per il ciclismo: un margine di '2.0' permette di pedalare fino a 2 km/h più veloce o più lento\n"
-                     "rispetto alla velocità target.\n\n"
-                     "Per la frequenza cardiaca: una tolleranza di 5 bpm permette variazioni di 5 battiti\n"
-                     "sopra o sotto il target impostato.")
-        
-        ttk.Label(grid_frame, text=help_text, wraplength=600, justify=tk.LEFT).grid(row=5, column=0, columnspan=4, padx=5, pady=15, sticky=tk.W)
+        ttk.Label(grid_frame, text=self._MARGINS_HELP, wraplength=600, justify=tk.LEFT).grid(row=5, column=0, columnspan=4, padx=5, pady=15, sticky=tk.W)
 
 
-    def load_data(self):
-        """Load configuration data"""
-        global workout_config
-        
-        # Load paces
-        for name, value in workout_config.get('paces', {}).items():
-            self.paces_tree.insert("", "end", values=(name, value))
-        
-        # Load speeds
-        for name, value in workout_config.get('speeds', {}).items():
-            self.speeds_tree.insert("", "end", values=(name, value))
-        
-        # Load heart rates
-        for name, value in workout_config.get('heart_rates', {}).items():
-            self.hr_tree.insert("", "end", values=(name, value))
+    def ensure_tab_built(self, event=None):
+        """Build and fill the selected tab the first time it is shown"""
+        tab = self.notebook.select()
+        if tab in self._built_tabs or tab not in self._tab_builders:
+            return
         
-        # Load margins
+        init_tab, load_tab_data = self._tab_builders[tab]
+        init_tab()
+        load_tab_data()
+        self._built_tabs.add(tab)
+    
+    def is_tab_built(self, frame):
+        """Return True if the tab of the given frame has been built"""
+        return str(frame) in self._built_tabs
+    
+    def load_paces_data(self):
+        """Load paces into the paces tab"""
+        self.fill_tree('paces', workout_config.get('paces', {}))
+    
+    def load_speeds_data(self):
+        """Load speeds into the speeds tab"""
+        self.fill_tree('speeds', workout_config.get('speeds', {}))
+    
+    def load_hr_data(self):
+        """Load heart rates into the heart rates tab"""
+        self.fill_tree('heart_rates', workout_config.get('heart_rates', {}))
+    
+    def load_margins_data(self):
+        """Load margins into the margins tab"""
         margins = workout_config.get('margins', {})
         self.faster_var.set(margins.get('faster', '0:03'))
         self.slower_var.set(margins.get('slower', '0:03'))
@@ -813,73 +942,65 @@ class ConfigEditorDialog(tk.Toplevel):
         self.slower_spd_var.set(margins.get('slower_spd', '2.0'))
         self.hr_up_var.set(margins.get('hr_up', 5))
         self.hr_down_var.set(margins.get('hr_down', 5))
-        
-        # Load sport type and name prefix
+    
+    def load_general_data(self):
+        """Load sport type and name prefix into the general tab"""
         self.sport_type_var.set(workout_config.get('sport_type', 'running'))
-        self.name_prefix_var.set(workout_config.get('name_prefix', ''))    
-
+        self.name_prefix_var.set(workout_config.get('name_prefix', ''))
+    
+    def fill_tree(self, section, values):
+        """Insert all the name/value pairs of a config section into its tree"""
+        tree = self._trees[section]
+        rows = self._rows[section] = {}
+        
+        with tree_frozen(tree):
+            insert = tree.insert
+            for row in values.items():
+                rows[insert("", "end", values=row)] = row
     
     def add_item(self, item_type):
         """Add a new pace, speed, or heart rate"""
-        if item_type == 'paces':
-            title = "Aggiungi Ritmo"
-        elif item_type == 'speeds':
-            title = "Aggiungi Velocità"
-        else:  # heart_rates
-            title = "Aggiungi Frequenza Cardiaca"
-            
-        dialog = ConfigItemDialog(self, title)
+        title_name, _ = CONFIG_ITEM_NAMES[item_type]
+        dialog = ConfigItemDialog(self, f"Aggiungi {title_name}", item_type)
         
         if dialog.result:
             name, value = dialog.result
             
             # Add to treeview
-            if item_type == 'paces':
-                tree = self.paces_tree
-            elif item_type == 'speeds':
-                tree = self.speeds_tree
-            else:  # heart_rates
-                tree = self.hr_tree
-                
-            tree.insert("", "end", values=(name, value))
+            item_id = self._trees[item_type].insert("", "end", values=(name, value))
+            self._rows[item_type][item_id] = (name, value)
     
     def edit_item(self, item_type):
-        """Edit a pace or heart rate"""
+        """Edit a pace, speed, or heart rate"""
+        title_name, type_name = CONFIG_ITEM_NAMES[item_type]
+        
         # Get the selected item
-        tree = self.paces_tree if item_type == 'paces' else self.hr_tree
+        tree = self._trees[item_type]
         selection = tree.selection()
         
         if not selection:
-            messagebox.showwarning("Nessuna selezione", f"Seleziona un {'ritmo' if item_type == 'paces' else 'frequenza cardiaca'} da modificare", parent=self)
+            messagebox.showwarning("Nessuna selezione", f"Seleziona un {type_name} da modificare", parent=self)
             return
         
         # Get the values
-        item_values = tree.item(selection[0], "values")
-        name, value = item_values
+        name, value = self._rows[item_type][selection[0]]
         
         # Open dialog
-        title = "Modifica " + ("Ritmo" if item_type == 'paces' else "Frequenza Cardiaca")
-        dialog = ConfigItemDialog(self, title, name, value)
+        dialog = ConfigItemDialog(self, f"Modifica {title_name}", item_type, name, value)
         
         if dialog.result:
             new_name, new_value = dialog.result
             
             # Update treeview
             tree.item(selection[0], values=(new_name, new_value))
+            self._rows[item_type][selection[0]] = (new_name, new_value)
     
     def delete_item(self, item_type):
         """Delete a pace, speed, or heart rate"""
+        _, type_name = CONFIG_ITEM_NAMES[item_type]
+        
         # Get the selected item
-        if item_type == 'paces':
-            tree = self.paces_tree
-            type_name = "ritmo"
-        elif item_type == 'speeds':
-            tree = self.speeds_tree
-            type_name = "velocità"
-        else:  # heart_rates
-            tree = self.hr_tree
-            type_name = "frequenza cardiaca"
-            
+        tree = self._trees[item_type]
         selection = tree.selection()
         
         if not selection:
@@ -887,8 +1008,7 @@ class ConfigEditorDialog(tk.Toplevel):
             return
         
         # Get the name
-        item_values = tree.item(selection[0], "values")
-        name = item_values[0]
+        name, _ = self._rows[item_type][selection[0]]
         
         # Confirm
         if not messagebox.askyesno("Conferma", f"Sei sicuro di voler eliminare {name}?", parent=self):
@@ -896,52 +1016,35 @@ class ConfigEditorDialog(tk.Toplevel):
         
         # Delete from treeview
         tree.delete(selection[0])
+        del self._rows[item_type][selection[0]]
     
     def save_data(self):
         """Save configuration data"""
         global workout_config
         
-        # Create new dictionaries
-        paces = {}
-        speeds = {}
-        heart_rates = {}
-        
-        # Get paces from treeview
-        for item_id in self.paces_tree.get_children():
-            name, value = self.paces_tree.item(item_id, "values")
-            paces[name] = value
-        
-        # Get speeds from treeview
-        for item_id in self.speeds_tree.get_children():
-            name, value = self.speeds_tree.item(item_id, "values")
-            speeds[name] = value
+        # Le schede mai aperte non possono essere state modificate: la loro sezione resta invariata
         
-        # Get heart rates from treeview
-        for item_id in self.hr_tree.get_children():
-            name, value = self.hr_tree.item(item_id, "values")
-            heart_rates[name] = value
+        # Get paces, speeds and heart rates from the rows kept alongside the treeviews
+        for section, rows in self._rows.items():
+            workout_config[section] = dict(rows.values())
         
         # Get margins
-        margins = {
-            'faster': self.faster_var.get(),
-            'slower': self.slower_var.get(),
-            'faster_spd': self.faster_spd_var.get(),
-            'slower_spd': self.slower_spd_var.get(),
-            'hr_up': self.hr_up_var.get(),
-            'hr_down': self.hr_down_var.get()
-        }
+        if self.is_tab_built(self.margins_frame):
+            workout_config['margins'] = {
+                'faster': self.faster_var.get(),
+                'slower': self.slower_var.get(),
+                'faster_spd': self.faster_spd_var.get(),
+                'slower_spd': self.slower_spd_var.get(),
+                'hr_up': self.hr_up_var.get(),
+                'hr_down': self.hr_down_var.get()
+            }
         
         # Get sport type and name prefix
-        sport_type = self.sport_type_var.get()
-        name_prefix = self.name_prefix_var.get()
+        if self.is_tab_built(self.general_frame):
+            workout_config['sport_type'] = self.sport_type_var.get()
+            workout_config['name_prefix'] = self.name_prefix_var.get()
         
-        # Update config
-        workout_config['paces'] = paces
-        workout_config['speeds'] = speeds
-        workout_config['heart_rates'] = heart_rates
-        workout_config['margins'] = margins
-        workout_config['sport_type'] = sport_type
-        workout_config['name_prefix'] = name_prefix
+        freeze_workout_config()
         
         return True
     
@@ -959,13 +1062,16 @@ class ConfigEditorDialog(tk.Toplevel):
 class ConfigItemDialog(tk.Toplevel):
     """Dialog for adding or editing a configuration item (pace or heart rate)"""
     
-    def __init__(self, parent, title, name="", value=""):
+    # Dimensioni iniziali della finestra
+    _SIZE = (450, 250)
+    
+    def __init__(self, parent, title, item_type, name="", value=""):
         super().__init__(parent)
         self.parent = parent
         self.result = None
         
         self.title(title)
-        self.geometry("450x250")
+        self.geometry("%dx%d" % self._SIZE)
         self.configure(bg=COLORS["bg_light"])
         
         # Rendi la finestra modale
@@ -994,33 +1100,8 @@ class ConfigItemDialog(tk.Toplevel):
         desc_frame = ttk.Frame(self)
         desc_frame.pack(fill=tk.X, padx=10, pady=10)
         
-        # Adatta il testo di aiuto in base al tipo (dedotto dal titolo)
-        if "Ritmo" in title:
-            help_text = """
-            Esempi di formati validi per ritmi (corsa):
-            
-            - '5:30-5:10' (intervallo di ritmo)
-            - '10km in 45:00' (distanza in tempo)
-            - '80-85% marathon' (percentuale di un altro ritmo)
-            - '5:30' (ritmo singolo)
-            """
-        elif "Velocità" in title:
-            help_text = """
-            Esempi di formati validi per velocità (ciclismo):
-            
-            - '25-30' (intervallo di velocità in km/h)
-            - '30.0' (velocità singola in km/h)
-            - '80-90% ftp' (percentuale di un'altra velocità)
-            - '25 km/h' (velocità con unità di misura)
-            """
-        else:  # Frequenza Cardiaca
-            help_text = """
-            Esempi di formati validi per frequenze cardiache:
-            
-            - '150-160' (intervallo di battiti)
-            - '70-76% max_hr' (percentuale di FC massima)
-            - '160' (valore singolo)
-            """
+        # Testo di aiuto in base al tipo di voce
+        help_text = CONFIG_ITEM_HELP[item_type]
         
         ttk.Label(desc_frame, text=help_text, wraplength=400, justify=tk.LEFT).pack(padx=5, pady=5, fill=tk.X)
         
@@ -1039,12 +1120,7 @@ class ConfigItemDialog(tk.Toplevel):
     
     def center_window(self):
         """Center the window on screen"""
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = (self.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f"{width}x{height}+{x}+{y}")
+        center_on_screen(self, self._SIZE)
     
     def on_ok(self):
         """Handle OK button click"""
@@ -1070,14 +1146,20 @@ class ConfigItemDialog(tk.Toplevel):
 class RepeatDialog(tk.Toplevel):
     """Dialog for adding/editing a repeat section"""
     
+    # Dimensioni iniziali della finestra
+    _SIZE = (700, 500)
+    
     def __init__(self, parent, iterations=None, steps=None, sport_type="running"):
         super().__init__(parent)
         self.parent = parent
         self.result = None
         self.sport_type = sport_type
         
+        # Dialogo per i passi, creato al primo uso e riutilizzato
+        self._step_dialog = None
+        
         self.title("Definisci ripetizione")
-        self.geometry("700x500")
+        self.geometry("%dx%d" % self._SIZE)
         self.configure(bg=COLORS["bg_light"])
         
         # Rendi la finestra modale
@@ -1090,9 +1172,12 @@ class RepeatDialog(tk.Toplevel):
         
         ttk.Label(repeat_frame, text="Numero di ripetizioni:").grid(row=0, column=0, padx=5, pady=5)
         
-        self.iterations_var = tk.StringVar(value=str(iterations) if iterations else "")
-        iterations_entry = ttk.Entry(repeat_frame, textvariable=self.iterations_var, width=5)
-        iterations_entry.grid(row=0, column=1, padx=5, pady=5)
+        # Accetta solo interi positivi già durante la digitazione
+        self.iterations_var = tk.IntVar(value=iterations if iterations else "")
+        vcmd = (self.register(self.validate_iterations), "%P")
+        self.iterations_entry = ttk.Entry(repeat_frame, textvariable=self.iterations_var, width=5,
+                                          validate="key", validatecommand=vcmd)
+        self.iterations_entry.grid(row=0, column=1, padx=5, pady=5)
         
         # Lista dei passi da ripetere
         steps_frame = ttk.LabelFrame(self, text="Passi da ripetere")
@@ -1133,6 +1218,7 @@ class RepeatDialog(tk.Toplevel):
         
         # Inizializza la lista dei passi
         self.repeat_steps = steps if steps else []
+        self._iids = []
         self.load_steps()
         
         # Centra la finestra
@@ -1141,59 +1227,73 @@ class RepeatDialog(tk.Toplevel):
         # Attendi la chiusura della finestra
         self.wait_window()
     
+    def get_step_dialog(self):
+        """Return the shared step dialog, creating it on first use"""
+        if self._step_dialog is None:
+            self._step_dialog = StepDialog(self, sport_type=self.sport_type, reusable=True)
+        return self._step_dialog
+    
     def add_step(self):
         """Add a new step to the repeat"""
-        dialog = StepDialog(self, sport_type=self.sport_type)
+        result = self.get_step_dialog().show()
         
-        if dialog.result:
-            step_type, step_detail = dialog.result
-            self.repeat_steps.append({step_type: step_detail})
-            self.load_steps()
+        if result:
+            step_type, step_detail = result
+            step = {step_type: step_detail}
+            self.repeat_steps.append(step)
+            
+            # Aggiunge solo la nuova riga
+            self._iids.append(self.steps_tree.insert("", "end", values=self.step_row(step)))
 
 
     def center_window(self):
         """Center the window on screen"""
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = (self.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f"{width}x{height}+{x}+{y}")
+        center_on_screen(self, self._SIZE)
     
     def load_steps(self):
         """Load steps into the treeview"""
-        # Clear existing items
-        for item in self.steps_tree.get_children():
-            self.steps_tree.delete(item)
-        
-        # Add steps to the tree
-        for step in self.repeat_steps:
-            if isinstance(step, dict):
-                step_type = list(step.keys())[0]
-                step_detail = step[step_type]
-                
-                # Handle case where step_detail is a list (old format)
-                if isinstance(step_detail, list):
-                    self.steps_tree.insert("", "end", values=(step_type, f"[Formato vecchio - {len(step_detail)} passi]"))
-                else:
-                    self.steps_tree.insert("", "end", values=(step_type, step_detail))
+        # Clear existing items (le righe sono già in _iids: niente get_children())
+        if self._iids:
+            self.steps_tree.delete(*self._iids)
+        
+        # Iid delle righe, nello stesso ordine di repeat_steps: le modifiche successive
+        # aggiornano solo le righe interessate
+        with tree_frozen(self.steps_tree):
+            insert = self.steps_tree.insert
+            self._iids = [insert("", "end", values=self.step_row(step)) for step in self.repeat_steps]
+    
+    def step_row(self, step):
+        """Return the treeview values for a step"""
+        if isinstance(step, dict) and len(step) == 1:
+            step_type = next(iter(step))
+            return (step_type, step[step_type])
+        # Formato non riconosciuto
+        return ("?", str(step))
+    
+    def selected_index(self):
+        """Return the position in repeat_steps of the selected row, or None"""
+        selection = self.steps_tree.selection()
+        if not selection:
+            return None
+        return self._iids.index(selection[0])
     
     def on_step_double_click(self, event):
         """Handle double click on a step to edit it"""
         self.edit_step()
 
+    def validate_iterations(self, value):
+        """Allow only an empty field or a positive integer without leading zeros"""
+        return value == "" or (value.isascii() and value.isdigit() and value[0] != "0")
+
     def on_ok(self):
         """Handle OK button click"""
         # Validate data
-        if not self.iterations_var.get():
+        if not self.iterations_entry.get():
             messagebox.showerror("Errore", "Inserisci il numero di ripetizioni", parent=self)
             return
         
-        try:
-            iterations = int(self.iterations_var.get())
-            if iterations <= 0:
-                raise ValueError()
-        except ValueError:
+        iterations = self.iterations_var.get()
+        if iterations <= 0:
             messagebox.showerror("Errore", "Il numero di ripetizioni deve essere un intero positivo", parent=self)
             return
         
@@ -1213,101 +1313,91 @@ class RepeatDialog(tk.Toplevel):
 
     def edit_step(self):
         """Edit the selected step"""
-        selection = self.steps_tree.selection()
-        
-        if not selection:
-            messagebox.showwarning("Nessuna selezione", "Seleziona un passo da modificare", parent=self)
-            return
-        
         # Get the selected step index
-        index = self.steps_tree.index(selection[0])
+        index = self.selected_index()
         
-        # Verifica che l'indice sia valido
-        if index < 0 or index >= len(self.repeat_steps):
-            messagebox.showwarning("Errore", "Indice del passo non valido.", parent=self)
+        if index is None:
+            messagebox.showwarning("Nessuna selezione", "Seleziona un passo da modificare", parent=self)
             return
             
         step = self.repeat_steps[index]
         
+        # Solo i passi con una singola chiave possono essere modificati con StepDialog
+        if not (isinstance(step, dict) and len(step) == 1):
+            messagebox.showinfo("Formato non supportato", 
+                               f"Questo passo ha un formato che non può essere modificato direttamente.\n"
+                               f"Ti suggeriamo di eliminarlo e ricrearlo.", parent=self)
+            return
+        
         # Get step type and detail
-        step_type = list(step.keys())[0]
+        step_type = next(iter(step))
         step_detail = step[step_type]
         
         # Open the step dialog
-        dialog = StepDialog(self, step_type, step_detail, sport_type=self.sport_type)
+        result = self.get_step_dialog().show(step_type, step_detail)
         
-        if dialog.result:
-            new_type, new_detail = dialog.result
-            self.repeat_steps[index] = {new_type: new_detail}
-            self.load_steps()
+        if result:
+            new_type, new_detail = result
+            new_step = {new_type: new_detail}
+            self.repeat_steps[index] = new_step
+            
+            # Aggiorna solo la riga modificata
+            self.steps_tree.item(self._iids[index], values=self.step_row(new_step))
 
     def remove_step(self):
         """Remove the selected step"""
-        selection = self.steps_tree.selection()
+        index = self.selected_index()
         
-        if not selection:
+        if index is None:
             messagebox.showwarning("Nessuna selezione", "Seleziona un passo da rimuovere", parent=self)
             return
         
-        # Get the selected step
-        index = self.steps_tree.index(selection[0])
-        
-        # Remove the step
+        # Remove the step and its row
         self.repeat_steps.pop(index)
-        self.load_steps()
+        self.steps_tree.delete(self._iids.pop(index))
 
-    def move_step_up(self):
-        """Move the selected step up"""
-        selection = self.steps_tree.selection()
+    def move_step(self, offset):
+        """Move the selected step by offset positions (-1 up, +1 down)"""
+        index = self.selected_index()
         
-        if not selection:
+        if index is None:
             return
         
-        # Get the selected step
-        index = self.steps_tree.index(selection[0])
-        
-        # Can't move up if already at the top
-        if index == 0:
+        # Can't move past the top or the bottom
+        target = index + offset
+        if target < 0 or target >= len(self.repeat_steps):
             return
         
-        # Swap with the step above
-        self.repeat_steps[index], self.repeat_steps[index - 1] = self.repeat_steps[index - 1], self.repeat_steps[index]
-        self.load_steps()
+        # Swap with the adjacent step, in the list and in the tree
+        self.repeat_steps[index], self.repeat_steps[target] = self.repeat_steps[target], self.repeat_steps[index]
+        self._iids[index], self._iids[target] = self._iids[target], self._iids[index]
+        item = self._iids[target]
+        self.steps_tree.move(item, "", target)
         
-        # Re-select the step
-        self.steps_tree.selection_set(self.steps_tree.get_children()[index - 1])
+        # La riga spostata resta selezionata: la rende visibile
+        self.steps_tree.see(item)
+
+    def move_step_up(self):
+        """Move the selected step up"""
+        self.move_step(-1)
 
     def move_step_down(self):
         """Move the selected step down"""
-        selection = self.steps_tree.selection()
-        
-        if not selection:
-            return
-        
-        # Get the selected step
-        index = self.steps_tree.index(selection[0])
-        
-        # Can't move down if already at the bottom
-        if index >= len(self.repeat_steps) - 1:
-            return
-        
-        # Swap with the step below
-        self.repeat_steps[index], self.repeat_steps[index + 1] = self.repeat_steps[index + 1], self.repeat_steps[index]
-        self.load_steps()
-        
-        # Re-select the step
-        self.steps_tree.selection_set(self.steps_tree.get_children()[index + 1])
+        self.move_step(1)
 
 class WorkoutEditor(tk.Toplevel):
     """Main workout editor window"""
     
+    # Dimensioni iniziali della finestra
+    _SIZE = (800, 700)
+    
     def __init__(self, parent, workout_name=None, workout_steps=None, sport_type=None):
         super().__init__(parent)
         self.parent = parent
         self.result = None
         
         self.title("Editor Allenamento")
-        self.geometry("800x700")
+        self.geometry("%dx%d" % self._SIZE)
         self.configure(bg=COLORS["bg_main"])
         
         # Stato dell'editor
@@ -1318,6 +1408,36 @@ class WorkoutEditor(tk.Toplevel):
         global workout_config
         self.sport_type = sport_type if sport_type else workout_config.get('sport_type', 'running')
         
+        # Stato dei ridisegni differiti (vedi schedule_redraw)
+        self._redraw_pending = False
+        self._redraw_args = None
+        self._last_draw_state = None
+        
+        # Stato del livello statico del canvas (tutto tranne l'elemento trascinato)
+        self._static_dirty = True
+        self._static_key = None
+        self._layout = None
+        
+        # Ultimo movimento ridisegnato durante il trascinamento: (indice di destinazione, x, y)
+        self._last_motion = None
+        
+        # Iid delle righe della treeview e indice reale in workout_steps per ogni
+        # numero visualizzato, riempiti da load_steps
+        self._iids = []
+        self.visual_to_real_index = {}
+        
+        # Elementi del trascinamento sul canvas, riusati tra un movimento e l'altro
+        self._ghost_items = None
+        
+        # Passi visibili (senza metadati) e relativi tipi, ricostruiti da load_steps
+        self._visible_steps = []
+        self._step_types = []
+        
+        # Font del canvas creati una volta sola, invece di passare tuple a ogni create_text
+        self._font_label = tkfont.Font(family="Arial", size=10, weight="bold")
+        self._font_step = tkfont.Font(family="Arial", size=9, weight="bold")
+        self._font_step_plain = tkfont.Font(family="Arial", size=9)
+        
         # Inizializza l'interfaccia
         self.init_ui()
         
@@ -1332,12 +1452,7 @@ class WorkoutEditor(tk.Toplevel):
     
     def center_window(self):
         """Center the window on screen"""
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = (self.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f"{width}x{height}+{x}+{y}")
+        center_on_screen(self, self._SIZE)
     
 
     def init_ui(self):
@@ -1348,7 +1463,7 @@ class WorkoutEditor(tk.Toplevel):
         # Tipo di sport
         ttk.Label(name_frame, text="Tipo di sport:").grid(row=0, column=0, padx=5, pady=5, sticky=tk.W)
         self.sport_type_var = tk.StringVar(value=self.sport_type)
-        sport_combo = ttk.Combobox(name_frame, textvariable=self.sport_type_var, values=["running", "cycling"], state="readonly", width=10)
+        sport_combo = ttk.Combobox(name_frame, textvariable=self.sport_type_var, values=SPORT_TYPES, state="readonly", width=10)
         sport_combo.grid(row=0, column=1, padx=5, pady=5, sticky=tk.W)
         sport_combo.bind("<<ComboboxSelected>>", self.on_sport_type_change)
 
@@ -1446,6 +1561,10 @@ class WorkoutEditor(tk.Toplevel):
         self.canvas.bind("<B1-Motion>", self.on_canvas_motion)
         self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
         
+        # Ridisegna quando il canvas ottiene (o cambia) le sue dimensioni reali
+        self._last_size = None
+        self.canvas.bind("<Configure>", self.on_canvas_configure)
+        
         # Inizializza i dati di trascinamento del canvas con una struttura completa
         self.canvas_drag_data = {
             "item": None,
@@ -1505,9 +1624,6 @@ class WorkoutEditor(tk.Toplevel):
         self.steps_tree.bind("<Double-1>", self.on_step_double_click)
         self.steps_tree.bind("<<TreeviewSelect>>", self.on_step_select)
         
-        # Programmazione del disegno iniziale dopo che l'interfaccia è stata completamente inizializzata
-        self.after(100, self.initial_draw)
-        
         # Chiamata esplicita per inizializzare la UI in base al tipo di sport
         # Passa None come event per indicare che è un'inizializzazione e non un cambio manuale
         self.on_sport_type_change(None)
@@ -1522,11 +1638,16 @@ class WorkoutEditor(tk.Toplevel):
             # Imposta il valore della variabile in base al tipo di sport attuale
             self.sport_type_var.set(self.sport_type)
         else:
+            # Riselezionare lo stesso sport non cambia nulla
+            sport_type = self.sport_type_var.get()
+            if sport_type == self.sport_type:
+                return
             # Aggiorna il tipo di sport in base alla selezione dell'utente
-            self.sport_type = self.sport_type_var.get()
+            self.sport_type = sport_type
         
-        # Ridisegna il workout per riflettere eventuali cambiamenti
-        self.draw_workout()
+        # Il disegno del workout non dipende dallo sport: il canvas viene
+        # già disegnato da load_steps e dai ridimensionamenti, quindi
+        # qui non serve ridisegnarlo
         
         # Mostra un avviso solo se è un cambio manuale (event non è None)
         # e se ci sono già passi definiti
@@ -1537,25 +1658,25 @@ class WorkoutEditor(tk.Toplevel):
 
 
     
-    def initial_draw(self):
-        """Force an initial drawing of the canvas to ensure dimensions are set correctly"""
-        # Forza l'aggiornamento del canvas
-        self.canvas.update_idletasks()
+    def on_canvas_configure(self, event):
+        """Redraw the workout when the canvas gets its real size"""
+        size = (event.width, event.height)
         
-        # Ridisegna il workout
-        self.draw_workout()
+        # Ridisegna solo se le dimensioni sono effettivamente cambiate
+        if size == self._last_size:
+            return
         
-        # Stampa informazioni di debug sulle dimensioni del canvas dopo l'inizializzazione
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
-        print(f"Canvas initialized with dimensions: {width}x{height}")
-        print(f"Canvas center calculated at y={height//2}")
+        self._last_size = size
+        self.draw_workout()
 
     def on_canvas_press(self, event):
         """Handle press on canvas for drag-and-drop with more flexible click area"""
-        # Canvas dimensions
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
+        # Canvas dimensions: quelle dell'ultimo <Configure>, senza interrogare Tk
+        if self._last_size is not None:
+            width, height = self._last_size
+        else:
+            width = self.canvas.winfo_width()
+            height = self.canvas.winfo_height()
         
         # Se il canvas non è ancora inizializzato correttamente, forza l'aggiornamento
         if width <= 1 or height <= 1:
@@ -1571,13 +1692,7 @@ class WorkoutEditor(tk.Toplevel):
         click_zone_height = 80  # Aumentata per essere più permissiva
         
         # Lista degli step visibili (filtrando i metadati)
-        metadata_keys = ["sport_type", "date"]
-        visible_steps = []
-        
-        for step in self.workout_steps:
-            # Salta i metadati
-            if not (isinstance(step, dict) and len(step) == 1 and list(step.keys())[0] in metadata_keys):
-                visible_steps.append(step)
+        visible_steps = self._visible_steps
         
         # Verifica che ci siano step
         if not visible_steps:
@@ -1596,49 +1711,43 @@ class WorkoutEditor(tk.Toplevel):
             if 0 <= step_visual_index < len(visible_steps):
                 # Seleziona anche nella TreeView
                 try:
-                    tree_item = self.steps_tree.get_children()[step_visual_index]
+                    tree_item = self._iids[step_visual_index]
                     self.steps_tree.selection_set(tree_item)
                     self.steps_tree.see(tree_item)
                 except Exception as e:
-                    print(f"Errore nella selezione dell'elemento: {str(e)}")
+                    logging.debug("Errore nella selezione dell'elemento: %s", e)
                 
                 # Memorizza i dettagli dell'elemento per il trascinamento
                 step = visible_steps[step_visual_index]
                 
-                # Inizializza i dati di trascinamento
-                self.canvas_drag_data = {
-                    "item": step,
-                    "index": step_visual_index,
-                    "start_x": event.x,
-                    "start_y": event.y,
-                    "current_x": event.x,
-                    "current_y": event.y
-                }
+                # Inizializza i dati di trascinamento (lo stesso dizionario viene riusato)
+                drag_data = self.canvas_drag_data
+                drag_data["item"] = step
+                drag_data["index"] = step_visual_index
+                drag_data["start_x"] = drag_data["current_x"] = event.x
+                drag_data["start_y"] = drag_data["current_y"] = event.y
+                self._last_motion = None
                 
-                # Determina tipo e colore
-                if 'repeat' in step and 'steps' in step:
-                    self.canvas_drag_data["type"] = "repeat"
-                    self.canvas_drag_data["color"] = COLORS["repeat"]
-                else:
-                    step_type = list(step.keys())[0]
-                    self.canvas_drag_data["type"] = step_type
-                    self.canvas_drag_data["color"] = COLORS.get(step_type, COLORS["other"])
+                # Determina tipo e colore (il tipo è già noto da load_steps)
+                step_type = self._step_types[step_visual_index]
+                drag_data["type"] = step_type
+                drag_data["color"] = COLORS.get(step_type, DEFAULT_STEP_COLOR)
                 
                 # Ridisegna con l'elemento evidenziato
-                self.draw_workout(highlight_index=step_visual_index)
+                self.schedule_redraw(highlight_index=step_visual_index)
                 return
         
         # Se arriviamo qui, nessuno step è stato selezionato
-        self.canvas_drag_data = {
-            "item": None,
-            "index": -1,
-            "start_x": 0,
-            "start_y": 0,
-            "current_x": 0,
-            "current_y": 0,
-            "type": "",
-            "color": ""
-        }
+        self.reset_canvas_drag_data()
+    
+    def reset_canvas_drag_data(self):
+        """Clear the canvas drag state in place"""
+        drag_data = self.canvas_drag_data
+        drag_data["item"] = None
+        drag_data["index"] = -1
+        drag_data["start_x"] = drag_data["start_y"] = 0
+        drag_data["current_x"] = drag_data["current_y"] = 0
+        drag_data["type"] = drag_data["color"] = ""
 
 
     def on_canvas_motion(self, event):
@@ -1649,17 +1758,10 @@ class WorkoutEditor(tk.Toplevel):
             self.canvas_drag_data["current_x"] = event.x
             self.canvas_drag_data["current_y"] = event.y
             
-            # Canvas dimensions
-            width = self.canvas.winfo_width()
-            height = self.canvas.winfo_height()
-            margin = 5
-            draw_width = width - 2 * margin
-            
-            # Lista degli step visibili
-            visible_steps = self.workout_steps
-            
-            # Larghezza di base per ogni step
-            base_width = draw_width / max(1, len(visible_steps))
+            # Margine e larghezza dei blocchi dell'ultimo disegno: niente winfo_* a ogni movimento.
+            # I ridisegni veri e propri sono già raggruppati da schedule_redraw
+            margin, base_width, _ = self._layout
+            visible_steps = self._visible_steps
             
             # Determina la nuova posizione in base alla coordinata x
             x = event.x
@@ -1668,37 +1770,26 @@ class WorkoutEditor(tk.Toplevel):
             # Limita l'indice all'intervallo valido
             new_index = max(0, min(new_index, len(visible_steps) - 1))
             
+            # Stessa posizione di destinazione e spostamento impercettibile: niente ridisegno
+            last_motion = self._last_motion
+            if (last_motion is not None and last_motion[0] == new_index
+                    and abs(event.x - last_motion[1]) < 2 and abs(event.y - last_motion[2]) < 2):
+                return
+            self._last_motion = (new_index, event.x, event.y)
+            
             # Ridisegna il grafico con l'indicatore di trascinamento
-            self.draw_workout(drag_from=self.canvas_drag_data["index"], drag_to=new_index, event_x=event.x, event_y=event.y)
+            self.schedule_redraw(drag_from=self.canvas_drag_data["index"], drag_to=new_index, event_x=event.x, event_y=event.y)
 
 
     def on_canvas_release(self, event):
         """Handle release to complete drag-and-drop on canvas"""
         # Solo se abbiamo un elemento selezionato
         if self.canvas_drag_data["item"] is not None:
-            # Canvas dimensions
-            width = self.canvas.winfo_width()
-            height = self.canvas.winfo_height()
-            margin = 5
-            draw_width = width - 2 * margin
+            # Margine e larghezza dei blocchi dell'ultimo disegno
+            margin, base_width, _ = self._layout
             
             # Lista degli step visibili (filtrando i metadati)
-            metadata_keys = ["sport_type", "date"]
-            visible_steps = []
-            visible_to_real_index = {}
-            real_to_visible_index = {}
-            
-            visible_idx = 0
-            for i, step in enumerate(self.workout_steps):
-                # Salta i metadati
-                if not (isinstance(step, dict) and len(step) == 1 and list(step.keys())[0] in metadata_keys):
-                    visible_steps.append(step)
-                    visible_to_real_index[visible_idx] = i
-                    real_to_visible_index[i] = visible_idx
-                    visible_idx += 1
-            
-            # Larghezza di base per ogni step
-            base_width = draw_width / max(1, len(visible_steps))
+            visible_steps = self._visible_steps
             
             # Determina la nuova posizione in base alla coordinata x
             x = event.x
@@ -1712,41 +1803,52 @@ class WorkoutEditor(tk.Toplevel):
             
             if new_visual_index != source_visual_index:
                 # Converti gli indici visibili in indici reali
-                source_real_index = visible_to_real_index.get(source_visual_index)
-                target_real_index = visible_to_real_index.get(new_visual_index)
+                # (visual_to_real_index usa i numeri visualizzati, che partono da 1)
+                source_real_index = self.visual_to_real_index.get(source_visual_index + 1)
+                target_real_index = self.visual_to_real_index.get(new_visual_index + 1)
                 
                 if source_real_index is not None and target_real_index is not None:
-                    # Esegui lo spostamento nella lista di step
-                    item = self.workout_steps.pop(source_real_index)
-                    
                     # Aggiusta l'indice target se necessario
                     if source_real_index < target_real_index:
                         target_real_index -= 1  # Compensa la rimozione dell'elemento
                     
-                    self.workout_steps.insert(target_real_index, item)
+                    if target_real_index == source_real_index:
+                        # Nessuno spostamento effettivo: ridisegna senza evidenziazione
+                        self.draw_workout()
+                        self.reset_canvas_drag_data()
+                        return
                     
-                    # Aggiorna sia il grafico che la lista
-                    self.load_steps()
+                    # Esegui lo spostamento nella lista di step
+                    if abs(target_real_index - source_real_index) == 1:
+                        # Passi adiacenti: basta uno scambio
+                        self.workout_steps[source_real_index], self.workout_steps[target_real_index] = \
+                            self.workout_steps[target_real_index], self.workout_steps[source_real_index]
+                    else:
+                        item = self.workout_steps.pop(source_real_index)
+                        self.workout_steps.insert(target_real_index, item)
+                    
+                    # Aggiorna sia il grafico che le sole righe coinvolte della lista (anche lo
+                    # scambio qui può coinvolgere un metadato, quindi vale il controllo generale)
+                    self.move_rows(source_visual_index + 1, new_visual_index + 1, False)
                     
                     # Tenta di selezionare l'elemento spostato nella lista
                     try:
-                        children = self.steps_tree.get_children()
-                        if 0 <= new_visual_index < len(children):
-                            target_item = children[new_visual_index]
+                        if 0 <= new_visual_index < len(self._iids):
+                            target_item = self._iids[new_visual_index]
                             self.steps_tree.selection_set(target_item)
                             self.steps_tree.see(target_item)
                     except Exception as e:
-                        print(f"Errore nella selezione dell'elemento: {str(e)}")
+                        logging.debug("Errore nella selezione dell'elemento: %s", e)
                 else:
                     # Log se ci sono problemi con gli indici
-                    print(f"Indice non trovato: source={source_visual_index}, target={new_visual_index}")
-                    print(f"Mappatura indici: {visible_to_real_index}")
+                    logging.warning("Indice non trovato: source=%s, target=%s, mappatura indici: %s",
+                                    source_visual_index, new_visual_index, self.visual_to_real_index)
             else:
                 # Se non c'è stato spostamento, ridisegna semplicemente senza evidenziazione
-                self.draw_workout()
+                self.schedule_redraw()
                 
             # Resetta i dati di trascinamento
-            self.canvas_drag_data = {"item": None, "index": -1, "start_x": 0, "start_y": 0}
+            self.reset_canvas_drag_data()
 
 
     def on_tree_press(self, event):
@@ -1756,7 +1858,7 @@ class WorkoutEditor(tk.Toplevel):
         if item:
             # Save the item details
             self.drag_data["item"] = item
-            index = self.steps_tree.index(item)
+            index = int(item) - 1  # L'iid è l'indice visualizzato (da 1)
             self.drag_data["index"] = index
 
     def on_tree_motion(self, event):
@@ -1777,20 +1879,31 @@ class WorkoutEditor(tk.Toplevel):
             target_item = self.steps_tree.identify_row(event.y)
             if target_item and target_item != self.drag_data["item"]:
                 # Get target index
-                target_index = self.steps_tree.index(target_item)
+                target_index = int(target_item) - 1
                 # Get source index
                 source_index = self.drag_data["index"]
                 
+                # Le righe escludono i metadati: converti negli indici reali di workout_steps
+                source_real_index = self.visual_to_real_index[source_index + 1]
+                target_real_index = self.visual_to_real_index[target_index + 1]
+                
                 # Move the item in the workout_steps list
-                item = self.workout_steps.pop(source_index)
-                self.workout_steps.insert(target_index, item)
+                swapped = abs(target_index - source_index) == 1
+                if swapped:
+                    # Adjacent steps: a swap is enough
+                    self.workout_steps[source_real_index], self.workout_steps[target_real_index] = \
+                        self.workout_steps[target_real_index], self.workout_steps[source_real_index]
+                else:
+                    item = self.workout_steps.pop(source_real_index)
+                    self.workout_steps.insert(target_real_index, item)
                 
-                # Reload the steps (which will update the treeview)
-                self.load_steps()
+                # Aggiorna solo le righe tra origine e destinazione (e il canvas)
+                self.move_rows(source_index + 1, target_index + 1, swapped)
                 
                 # Select the moved item
-                self.steps_tree.selection_set(self.steps_tree.get_children()[target_index])
-                self.steps_tree.focus(self.steps_tree.get_children()[target_index])
+                target_item = self._iids[target_index]
+                self.steps_tree.selection_set(target_item)
+                self.steps_tree.focus(target_item)
                 
             # Reset drag data
             self.drag_data = {"item": None, "index": -1}
@@ -1798,12 +1911,9 @@ class WorkoutEditor(tk.Toplevel):
 
     def load_steps(self):
         """Carica i passi dell'allenamento nella treeview e nel canvas"""
-        # Cancella i passi esistenti
-        for item in self.steps_tree.get_children():
-            self.steps_tree.delete(item)
-        
-        # Metadati da ignorare nella visualizzazione
-        metadata_keys = ["sport_type", "date"]
+        # Cancella i passi esistenti (le righe sono già in _iids: niente get_children())
+        if self._iids:
+            self.steps_tree.delete(*self._iids)
         
         # Indice per numerare i passi (solo quelli effettivamente mostrati)
         index = 1
@@ -1811,65 +1921,163 @@ class WorkoutEditor(tk.Toplevel):
         # Mappa degli indici visualizzati agli indici reali
         self.visual_to_real_index = {}
         
+        # Iid delle righe nell'ordine visualizzato (evita get_children() dopo ogni modifica)
+        self._iids = []
+        
+        # Passi visibili nello stesso ordine e loro tipi ("repeat" per le ripetizioni),
+        # usati dal disegno e dal trascinamento sul canvas
+        self._visible_steps = []
+        self._step_types = []
+        
         # Aggiungi i passi alla treeview, ignorando i metadati
-        for i, step in enumerate(self.workout_steps):
-            # Salta i metadati
-            if isinstance(step, dict) and len(step) == 1 and list(step.keys())[0] in metadata_keys:
-                continue
-                
-            # Per i passi regolari, determina tipo e dettagli
-            if isinstance(step, dict) and 'repeat' in step and 'steps' in step:
-                # È un passo di ripetizione
-                step_type = "repeat"
-                iterations = step['repeat']
-                substeps = step['steps']
-                
-                details = f"{iterations} ripetizioni ({len(substeps)} passi)"
-                
-                # Aggiungi alla treeview (senza i sottopassi)
-                item = self.steps_tree.insert("", "end", values=(index, step_type, details))
-                
-                # Salva il mapping dell'indice
-                self.visual_to_real_index[index] = i
-                
-                # Incrementa l'indice solo per i passi visibili
-                index += 1
-                
-                # Non aggiungiamo più i substeps come figli
-                # Commentiamo o rimuoviamo il codice che aggiungeva i sottopassi
-                # for j, substep in enumerate(substeps, 1):
-                #     if isinstance(substep, dict) and len(substep) == 1:
-                #         sub_type = list(substep.keys())[0]
-                #         sub_detail = substep[sub_type]
-                #         sub_item = self.steps_tree.insert(item, "end", values=(f"{index-1}.{j}", sub_type, sub_detail))
-            elif isinstance(step, dict) and len(step) == 1:
-                # È un passo normale
-                step_type = list(step.keys())[0]
-                details = step[step_type]
+        with tree_frozen(self.steps_tree):
+            for i, step in enumerate(self.workout_steps):
+                # Salta i metadati
+                if is_metadata_step(step):
+                    continue
                 
-                # Aggiungi alla treeview
-                self.steps_tree.insert("", "end", values=(index, step_type, details))
+                # Tipo e valori della riga (le ripetizioni senza i sottopassi, i passi con
+                # formato sconosciuto come "?", così righe e blocchi del disegno restano allineati)
+                step_type, values = self.row_values(index, step)
+                self._iids.append(self.steps_tree.insert("", "end", iid=str(index), values=values))
                 
                 # Salva il mapping dell'indice
                 self.visual_to_real_index[index] = i
+                self._visible_steps.append(step)
+                self._step_types.append(step_type)
                 
                 # Incrementa l'indice solo per i passi visibili
                 index += 1
-            else:
-                # Salta passi con formato sconosciuto
-                continue
         
         # Disegna l'anteprima dell'allenamento
-        self.draw_workout()
+        self.redraw_steps()
+    
+    def redraw_steps(self):
+        """Redraw the workout preview after the steps changed"""
+        self._static_dirty = True
+        
+        # Prima del primo <Configure> il canvas non ha ancora dimensioni reali:
+        # il primo disegno lo fa on_canvas_configure
+        if self._last_size is not None:
+            self.draw_workout()
+    
+    def row_values(self, index, step):
+        """Return the step type (None if not recognized) and the treeview values of the row with the given displayed number"""
+        if isinstance(step, dict):
+            if 'repeat' in step and 'steps' in step:
+                return "repeat", (index, "repeat", f"{step['repeat']} ripetizioni ({len(step['steps'])} passi)")
+            if len(step) == 1:
+                step_type = next(iter(step))
+                return step_type, (index, step_type, step[step_type])
+        # Formato non riconosciuto: riga "?" nella lista e blocco "[?]" nel disegno
+        return None, (index, "?", str(step))
+    
+    def append_row(self):
+        """Add the row of the step just appended to workout_steps"""
+        step = self.workout_steps[-1]
+        index = len(self._iids) + 1
+        
+        self.visual_to_real_index[index] = len(self.workout_steps) - 1
+        step_type, values = self.row_values(index, step)
+        self._visible_steps.append(step)
+        self._step_types.append(step_type)
+        self._iids.append(self.steps_tree.insert("", "end", iid=str(index), values=values))
+        
+        self.redraw_steps()
+    
+    def remove_row(self, visual_index):
+        """Update the list after the step of the given row (displayed number) was removed from workout_steps"""
+        last = len(self._iids)
+        
+        # I passi successivi scalano di una posizione, sia nella lista reale che in quella visualizzata
+        mapping = self.visual_to_real_index
+        for index in range(visual_index, last):
+            mapping[index] = mapping[index + 1] - 1
+        del mapping[last]
+        del self._visible_steps[visual_index - 1]
+        del self._step_types[visual_index - 1]
+        
+        # La selezione passerebbe alla riga che ora mostra il passo successivo: va tolta,
+        # come faceva il ricaricamento completo
+        self.steps_tree.selection_remove(self.steps_tree.selection())
+        
+        # L'iid è il numero visualizzato: sparisce l'ultima riga e quelle dopo la rimossa si aggiornano
+        self.steps_tree.delete(self._iids.pop())
+        if visual_index < last:
+            self.refresh_rows(visual_index, last - 1)
+        else:
+            self.redraw_steps()
+    
+    def move_rows(self, source, target, swapped):
+        """Update the list after a step moved between two rows (displayed numbers)"""
+        first, last = min(source, target), max(source, target)
+        
+        # Con pop/insert si spostano anche i metadati compresi tra le due righe: le posizioni
+        # reali cambiano e serve ricaricare tutto. Con uno scambio restano le stesse
+        mapping = self.visual_to_real_index
+        if not swapped and mapping[last] - mapping[first] != last - first:
+            self.load_steps()
+        else:
+            self.refresh_rows(first, last)
+    
+    def refresh_rows(self, first, last):
+        """Refresh the treeview rows first..last (displayed numbers) after a reorder, then redraw the canvas"""
+        # Le righe restano al loro posto (iid = numero visualizzato): cambiano solo i valori
+        for index in range(first, last + 1):
+            step = self._visible_steps[index - 1] = self.workout_steps[self.visual_to_real_index[index]]
+            self._step_types[index - 1], values = self.row_values(index, step)
+            self.steps_tree.item(self._iids[index - 1], values=values)
+        
+        self.redraw_steps()
+
+    def schedule_redraw(self, highlight_index=None, drag_from=None, drag_to=None, event_x=None, event_y=None):
+        """Request a redraw; bursts of requests are coalesced into one draw when Tk is idle"""
+        # L'ultima richiesta vince
+        self._redraw_args = (highlight_index, drag_from, drag_to, event_x, event_y)
+        
+        if not self._redraw_pending:
+            self._redraw_pending = True
+            self.after_idle(self._do_redraw)
+    
+    def _do_redraw(self):
+        """Run the pending redraw, skipping it if nothing changed since the last draw"""
+        self._redraw_pending = False
+        args = self._redraw_args
+        
+        # Un disegno diretto nel frattempo ha già aggiornato il canvas
+        if args is None:
+            return
+        
+        if (len(self.workout_steps),) + args == self._last_draw_state:
+            self._redraw_args = None
+            return
+        
+        # Durante il trascinamento il livello statico non cambia: basta spostare l'elemento trascinato
+        highlight_index, drag_from, drag_to, event_x, event_y = args
+        if (drag_from is not None and event_x is not None and event_y is not None and not self._static_dirty
+                and self._static_key == (len(self.workout_steps), highlight_index, drag_from)):
+            self._redraw_args = None
+            self._last_draw_state = (len(self.workout_steps),) + args
+            self.draw_drag_overlay(drag_from, drag_to, event_x, event_y)
+            return
+        
+        self.draw_workout(*args)
     
-
     def draw_workout(self, highlight_index=None, drag_from=None, drag_to=None, event_x=None, event_y=None):
         """Draw a visual representation of the workout on the canvas with visible separators between steps"""
+        # Questo disegno rende superata qualsiasi richiesta in attesa
+        self._redraw_args = None
+        self._last_draw_state = (len(self.workout_steps), highlight_index, drag_from, drag_to, event_x, event_y)
+        
         self.canvas.delete("all")
+        self._ghost_items = None
         
-        # Canvas dimensions
-        width = self.canvas.winfo_width()
-        height = self.canvas.winfo_height()
+        # Canvas dimensions: quelle dell'ultimo <Configure>, senza interrogare Tk
+        if self._last_size is not None:
+            width, height = self._last_size
+        else:
+            width = self.canvas.winfo_width()
+            height = self.canvas.winfo_height()
         
         if width <= 1 or height <= 1:  # Canvas not yet realized
             self.canvas.update_idletasks()
@@ -1889,13 +2097,8 @@ class WorkoutEditor(tk.Toplevel):
         draw_width = width - 2 * margin
         draw_height = height - 2 * margin
         
-        # Lista degli step visibili (filtrando i metadati)
-        metadata_keys = ["sport_type", "date"]
-        visible_steps = []
-        for step in self.workout_steps:
-            # Salta i metadati
-            if not (isinstance(step, dict) and len(step) == 1 and list(step.keys())[0] in metadata_keys):
-                visible_steps.append(step)
+        # Lista degli step visibili (filtrando i metadati), mantenuta da load_steps
+        visible_steps = self._visible_steps
         
         # Calcola la larghezza totale disponibile
         total_width = draw_width
@@ -1910,33 +2113,41 @@ class WorkoutEditor(tk.Toplevel):
         # Numerazione progressiva degli step
         step_number = 1
         
-        # Se stiamo trascinando, disegna un indicatore per la posizione target
-        if drag_from is not None and drag_to is not None:
-            # Calcola la posizione x dell'indicatore di trascinamento
-            indicator_x = margin + drag_to * base_width
-            
-            # Disegna una linea verticale per indicare dove verrà inserito l'elemento
-            self.canvas.create_line(
-                indicator_x, y - 30, 
-                indicator_x, y + 30,
-                fill=COLORS["accent"], width=2, dash=(6, 4)
-            )
+        # Primo passaggio: calcola solo la geometria degli elementi, raggruppandoli per stile.
+        # Gli attributi comuni vengono applicati una sola volta per tag nel secondo passaggio.
+        boxes = []            # (x1, y1, x2, y2, tipo, evidenziato)
+        labels = []           # (x, y, testo)
+        unknown_labels = []   # (x, y, testo) per i passi non disegnabili
+        separators = []       # (x, y1, y2) tra step principali
+        sub_separators = []   # (x, y1, y2) tra i passi di una ripetizione
+        repeat_boxes = []     # (x1, y1, x2, y2)
+        repeat_labels = []    # (x, y, testo)
+        
+        # Metodi e costanti usati nel ciclo, risolti una sola volta
+        add_box = boxes.append
+        add_label = labels.append
+        icon_for = STEP_ICONS.get
+        default_icon = DEFAULT_STEP_ICON
+        last_index = len(visible_steps) - 1
+        
+        step_types = self._step_types
         
-        # Draw representation
         for i, step in enumerate(visible_steps):
+            # Calcola se questo step deve essere evidenziato
+            is_highlighted = (i == highlight_index)
+            
+            # Salta temporaneamente il disegno dell'elemento che stiamo trascinando
+            if i == drag_from and event_x is not None and event_y is not None:
+                x += base_width  # Salta avanti
+                continue  # Non disegnare questo elemento nella sua posizione originale
+            
             try:
-                # Calcola se questo step deve essere evidenziato
-                is_highlighted = (i == highlight_index)
-                
-                # Salta temporaneamente il disegno dell'elemento che stiamo trascinando
-                if i == drag_from and event_x is not None and event_y is not None:
-                    x += base_width  # Salta avanti
-                    continue  # Non disegnare questo elemento nella sua posizione originale
-                
-                outline_width = 2 if is_highlighted else 0
-                outline_color = COLORS["accent"] if is_highlighted else ""
-                
-                if 'repeat' in step and 'steps' in step:
+                step_type = step_types[i]
+                if step_type is None:
+                    # Passo in formato non riconosciuto
+                    add_box((x, y - 20, x + base_width, y + 20, "other", is_highlighted))
+                    unknown_labels.append((x + base_width // 2, y, "[?]"))
+                elif step_type == "repeat":
                     # Repeat step
                     iterations = step['repeat']
                     substeps = step['steps']
@@ -1944,231 +2155,166 @@ class WorkoutEditor(tk.Toplevel):
                     # Larghezza per ogni ripetizione
                     repeat_width = base_width
                     
-                    # Draw repeat box
-                    repeat_x = x
-                    repeat_y = y - 30
-                    self.canvas.create_rectangle(
-                        repeat_x, repeat_y, 
-                        repeat_x + repeat_width, repeat_y + 60,
-                        outline=COLORS["repeat"], width=2, dash=(5, 2)
-                    )
+                    # Repeat box e label
+                    repeat_boxes.append((x, y - 30, x + repeat_width, y + 30))
+                    repeat_labels.append((x + 10, y - 40, f"{STEP_ICONS['repeat']} {iterations}x"))
                     
-                    # Draw repeat label
-                    self.canvas.create_text(
-                        repeat_x + 10, repeat_y - 10,
-                        text=f"{STEP_ICONS['repeat']} {iterations}x",
-                        fill=COLORS["repeat"], 
-                        font=("Arial", 10, "bold"),
-                        anchor=tk.W
-                    )
-                    
-                    # Draw substeps
+                    # Substeps
                     sub_width = repeat_width / max(1, len(substeps)) # Distribuisci uniformemente
-                    sub_x = x
-                    sub_number = 1  # Numerazione dei substep all'interno della ripetizione
                     
-                    for substep in substeps:
-                        if isinstance(substep, dict):
-                            substep_type = list(substep.keys())[0]
-                            
-                            # Color for this type
-                            color = COLORS.get(substep_type, COLORS["other"])
-                            
-                            # Draw box
-                            self.canvas.create_rectangle(
-                                sub_x, y - 20, sub_x + sub_width, y + 20,
-                                fill=color, outline=outline_color, width=outline_width
-                            )
-                            
-                            # Draw text
-                            self.canvas.create_text(
-                                sub_x + sub_width // 2, y,
-                                text=f"{STEP_ICONS.get(substep_type, '📝')} {sub_number}",
-                                fill=COLORS["text_light"],
-                                font=("Arial", 9, "bold")
-                            )
-                            
-                            # Disegna separatore tra substep (eccetto l'ultimo)
-                            if sub_number < len(substeps):
-                                self.canvas.create_line(
-                                    sub_x + sub_width, y - 20,
-                                    sub_x + sub_width, y + 20,
-                                    fill="white", width=1
-                                )
-                            
-                            # Move to next position
-                            sub_x += sub_width
-                            sub_number += 1
+                    # Tipi e posizioni x dei substep calcolati in blocco, senza accumulare x passo per passo
+                    substep_types = [next(iter(substep)) for substep in substeps if isinstance(substep, dict)]
+                    sub_xs = [x + k * sub_width for k in range(len(substep_types))]
                     
-                    # Aggiorna la posizione x per il prossimo step principale
-                    x += repeat_width
-                    step_number += 1
+                    # Numerazione dei substep all'interno della ripetizione
+                    for sub_number, (sub_x, substep_type) in enumerate(zip(sub_xs, substep_types), 1):
+                        add_box((sub_x, y - 20, sub_x + sub_width, y + 20, substep_type, is_highlighted))
+                        add_label((sub_x + sub_width // 2, y, f"{icon_for(substep_type, default_icon)} {sub_number}"))
+                        
+                        # Separatore tra substep (eccetto l'ultimo)
+                        if sub_number < len(substeps):
+                            sub_separators.append((sub_x + sub_width, y - 20, y + 20))
                     
                 else:
                     # Regular step
-                    step_type = list(step.keys())[0]
-                    
-                    # Calculate width based on base_width
-                    step_width = base_width
-                    
-                    # Color for this type
-                    color = COLORS.get(step_type, COLORS["other"])
-                    
-                    # Draw box
-                    self.canvas.create_rectangle(
-                        x, y - 20, x + step_width, y + 20,
-                        fill=color, outline=outline_color, width=outline_width
-                    )
-                    
-                    # Draw text
-                    self.canvas.create_text(
-                        x + step_width // 2, y,
-                        text=f"{STEP_ICONS.get(step_type, '📝')} {step_number}",
-                        fill=COLORS["text_light"],
-                        font=("Arial", 9, "bold")
-                    )
-                    
-                    # Move to next position
-                    x += step_width
-                    step_number += 1
+                    add_box((x, y - 20, x + base_width, y + 20, step_type, is_highlighted))
+                    add_label((x + base_width // 2, y, f"{icon_for(step_type, default_icon)} {step_number}"))
                     
             except Exception as e:
                 # Skip drawing problematic steps
-                step_width = base_width
-                self.canvas.create_rectangle(
-                    x, y - 20, x + step_width, y + 20,
-                    fill=COLORS["other"], outline=outline_color, width=outline_width
-                )
-                
-                self.canvas.create_text(
-                    x + step_width // 2, y,
-                    text=f"[?]",
-                    fill=COLORS["text_light"],
-                    font=("Arial", 9)
-                )
-                
-                x += step_width
-                step_number += 1
-                
-            # Disegna separatori tra step principali (linea verticale)
-            if i < len(visible_steps) - 1:  # Non disegnare dopo l'ultimo step
-                self.canvas.create_line(
-                    x, y - 22,  # Leggermente oltre il bordo del rettangolo
-                    x, y + 22,
-                    fill="#333333", width=1, dash=(2, 2)  # Linea tratteggiata grigia
-                )
-        
-        # Se stiamo trascinando, disegna l'elemento trascinato sotto il cursore
-        if drag_from is not None and event_x is not None and event_y is not None and 'type' in self.canvas_drag_data:
-            block_width = base_width
-            block_height = 40
+                add_box((x, y - 20, x + base_width, y + 20, "other", is_highlighted))
+                unknown_labels.append((x + base_width // 2, y, "[?]"))
+            
+            # Aggiorna la posizione x per il prossimo step principale
+            x += base_width
+            step_number += 1
+            
+            # Separatori tra step principali (linea verticale), non dopo l'ultimo step
+            if i < last_index:
+                separators.append((x, y - 22, y + 22))  # Leggermente oltre il bordo del rettangolo
+        
+        # Geometria e contenuto del livello statico appena disegnato
+        self._layout = (margin, base_width, y)
+        hidden_index = drag_from if event_x is not None and event_y is not None else None
+        self._static_key = (len(self.workout_steps), highlight_index, hidden_index)
+        self._static_dirty = False
+        
+        # Secondo passaggio: crea gli elementi con i soli dati variabili e applica
+        # lo stile una volta per gruppo tramite i tag
+        canvas = self.canvas
+        line = canvas.create_line
+        rect = canvas.create_rectangle
+        text_item = canvas.create_text
+        configure = canvas.itemconfigure
+        text_light = COLORS["text_light"]
+        
+        # Le separazioni vanno sotto i box, come se fossero disegnate step per step
+        for sep_x, y1, y2 in separators:
+            line(sep_x, y1, sep_x, y2, tags="separator")
+        configure("separator", fill="#333333", width=1, dash=(2, 2))  # Linea tratteggiata grigia
+        
+        for coords in repeat_boxes:
+            rect(coords, tags="repeat_box")
+        configure("repeat_box", outline=COLORS["repeat"], width=2, dash=(5, 2))
+        
+        step_types = set()
+        for x1, y1, x2, y2, step_type, is_highlighted in boxes:
+            tags = ("step_box", f"type_{step_type}", "highlight") if is_highlighted else ("step_box", f"type_{step_type}")
+            rect(x1, y1, x2, y2, tags=tags)
+            step_types.add(step_type)
+        configure("step_box", outline="", width=0)
+        for step_type in step_types:
+            configure(f"type_{step_type}", fill=COLORS.get(step_type, DEFAULT_STEP_COLOR))
+        configure("highlight", outline=COLORS["accent"], width=2)
+        
+        for sep_x, y1, y2 in sub_separators:
+            line(sep_x, y1, sep_x, y2, tags="sub_separator")
+        configure("sub_separator", fill="white", width=1)
+        
+        for text_x, text_y, text in labels:
+            text_item(text_x, text_y, text=text, tags="label")
+        configure("label", fill=text_light, font=self._font_step)
+        
+        for text_x, text_y, text in unknown_labels:
+            text_item(text_x, text_y, text=text, tags="unknown_label")
+        configure("unknown_label", fill=text_light, font=self._font_step_plain)
+        
+        for text_x, text_y, text in repeat_labels:
+            text_item(text_x, text_y, text=text, anchor=tk.W, tags="repeat_label")
+        configure("repeat_label", fill=COLORS["repeat"], font=self._font_label)
+        
+        canvas.addtag_all("static")
+        
+        self.draw_drag_overlay(drag_from, drag_to, event_x, event_y)
+    
+    def draw_drag_overlay(self, drag_from, drag_to, event_x, event_y):
+        """Draw the drop indicator and the dragged element on top of the static layer"""
+        canvas = self.canvas
+        margin, base_width, y = self._layout
+        
+        show_indicator = drag_from is not None and drag_to is not None
+        show_element = drag_from is not None and event_x is not None and event_y is not None
+        
+        if not (show_indicator or show_element):
+            if self._ghost_items is not None:
+                canvas.delete("ghost")
+                self._ghost_items = None
+            return
+        
+        element_type = self.canvas_drag_data.get("type")
+        color = self.canvas_drag_data.get("color")
+        key = (drag_from, element_type, color)
+        
+        # Gli elementi del trascinamento si creano una volta per trascinamento:
+        # ai movimenti successivi vengono solo spostati
+        if self._ghost_items is None or self._ghost_items[0] != key:
+            canvas.delete("ghost")
+            
+            # Linea verticale che indica dove verrà inserito l'elemento
+            indicator = canvas.create_line(0, 0, 0, 0, fill=COLORS["accent"], width=2, dash=(6, 4), tags="ghost")
             
-            # Disegna un rettangolo semitrasparente che rappresenta l'elemento trascinato
-            element_type = self.canvas_drag_data["type"]
-            color = self.canvas_drag_data["color"]
+            # L'indicatore resta sotto i box, come quando veniva disegnato per primo
+            canvas.tag_lower(indicator)
             
             # Per ottenere un effetto semitrasparente, usiamo un colore leggermente più chiaro
             # Questo non è vera trasparenza (richiederebbe il supporto alpha), ma è un buon sostituto
-            light_color = self.lighten_color(color)
-            
-            # Disegna il rettangolo centrato sul cursore
-            self.canvas.create_rectangle(
-                event_x - block_width/2, event_y - block_height/2,
-                event_x + block_width/2, event_y + block_height/2,
-                fill=light_color, outline=COLORS["accent"], width=2
-            )
+            light_color = (COLORS_LIGHT.get(color) or lighten_color(color)) if color else ""
+            block = canvas.create_rectangle(0, 0, 0, 0, fill=light_color, outline=COLORS["accent"], width=2, tags="ghost")
             
             # Aggiunge anche un'icona o un numero all'elemento trascinato
             if element_type == "repeat":
                 icon = STEP_ICONS["repeat"]
             else:
-                icon = STEP_ICONS.get(element_type, '📝')
+                icon = STEP_ICONS.get(element_type, DEFAULT_STEP_ICON)
             
-            self.canvas.create_text(
-                event_x, event_y,
-                text=f"{icon} {drag_from + 1}",
-                fill=COLORS["text_dark"],
-                font=("Arial", 9, "bold")
-            )
-
-
-    def lighten_color(self, hex_color):
-        """Rende più chiaro un colore hexadecimale mescolandolo con bianco"""
-        # Converte hex_color in componenti RGB
-        r = int(hex_color[1:3], 16)
-        g = int(hex_color[3:5], 16)
-        b = int(hex_color[5:7], 16)
-        
-        # Mescola con bianco (255,255,255) con un rapporto 40/60
-        r = r * 0.6 + 255 * 0.4
-        g = g * 0.6 + 255 * 0.4
-        b = b * 0.6 + 255 * 0.4
-        
-        # Converte in hex e restituisce
-        return f"#{int(r):02x}{int(g):02x}{int(b):02x}"
-
-    
-    def get_step_visual_length(self, step):
-        """Calculate a visual length for a step based on its duration/distance"""
-        if 'repeat' in step:
-            # For repeat steps, calculate based on substeps
-            return 10  # Default size for empty repeats
-        
-        step_type = list(step.keys())[0]
-        step_detail = step[step_type]
+            label = canvas.create_text(0, 0, text=f"{icon} {drag_from + 1}", fill=COLORS["text_dark"],
+                                       font=self._font_step, tags="ghost")
+            
+            self._ghost_items = (key, indicator, block, label)
         
-        # Handle case where step_detail is a list (old format)
-        if isinstance(step_detail, list):
-            return 30  # Default length for steps with unknown structure
+        _, indicator, block, label = self._ghost_items
+        coords = canvas.coords
+        configure = canvas.itemconfigure
         
-        # Extract the duration/distance
-        if ' @ ' in step_detail:
-            measure = step_detail.split(' @ ')[0].strip()
+        if show_indicator:
+            indicator_x = margin + drag_to * base_width
+            coords(indicator, indicator_x, y - 30, indicator_x, y + 30)
+            configure(indicator, state="normal")
         else:
-            measure = step_detail.strip()
+            configure(indicator, state="hidden")
         
-        # Try to parse the measure
-        try:
-            if 'min' in measure:
-                # Duration in minutes
-                mins = float(measure.replace('min', '').strip())
-                return mins * 5  # Scale factor for minutes
-            elif 'km' in measure:
-                # Distance in km
-                km = float(measure.replace('km', '').strip())
-                return km * 50  # Scale factor for km
-            elif 'm' in measure:
-                # Distance in meters
-                m = float(measure.replace('m', '').strip())
-                return m / 20  # Scale factor for meters
-            else:
-                # Default length if parsing fails
-                return 30
-        except ValueError:
-            # Default length if parsing fails
-            return 30
-    
-    def get_step_display_text(self, step_type, step_detail):
-        """Get a short display text for a step"""
-        # Handle case where step_detail is a list (old format)
-        if isinstance(step_detail, list):
-            return f"{step_type} ({len(step_detail)} steps)"
-        
-        # Extract the measure and zone
-        if ' @ ' in step_detail:
-            measure, zone = step_detail.split(' @ ', 1)
-            
-            # Remove description if any
-            if ' -- ' in zone:
-                zone = zone.split(' -- ')[0].strip()
-            
-            return f"{measure} @ {zone}"
+        if show_element:
+            # Rettangolo centrato sul cursore
+            half_width = base_width / 2
+            block_height = 40
+            coords(block, event_x - half_width, event_y - block_height / 2,
+                   event_x + half_width, event_y + block_height / 2)
+            coords(label, event_x, event_y)
+            configure(block, state="normal")
+            configure(label, state="normal")
         else:
-            # Remove description if any
-            if ' -- ' in step_detail:
-                step_detail = step_detail.split(' -- ')[0].strip()
-            
-            return step_detail
+            configure(block, state="hidden")
+            configure(label, state="hidden")
     
     def add_step(self):
         """Add a new step to the workout"""
@@ -2177,7 +2323,7 @@ class WorkoutEditor(tk.Toplevel):
         if dialog.result:
             step_type, step_detail = dialog.result
             self.workout_steps.append({step_type: step_detail})
-            self.load_steps()
+            self.append_row()
     
     def add_repeat(self):
         """Add a repeat section"""
@@ -2192,8 +2338,8 @@ class WorkoutEditor(tk.Toplevel):
             # Add to steps list
             self.workout_steps.append(repeat_step)
             
-            # Reload the steps
-            self.load_steps()
+            # Aggiungi solo la nuova riga
+            self.append_row()
     
     def edit_step(self):
         """Edit the selected step"""
@@ -2205,24 +2351,17 @@ class WorkoutEditor(tk.Toplevel):
         
         # Get the selected step index
         item = selection[0]
-        item_values = self.steps_tree.item(item, "values")
-        visual_index = int(item_values[0])  # Indice visualizzato
-        
-        # Verifica che sia un indice numerico intero (non un sottopasso)
-        if "." in str(visual_index):
-            messagebox.showinfo("Informazione", "Seleziona un passo principale (non un sottopasso).", parent=self)
-            return
+        visual_index = int(item)  # L'iid è l'indice visualizzato
         
         # Converti l'indice visualizzato in indice reale
-        if not hasattr(self, 'visual_to_real_index') or visual_index not in self.visual_to_real_index:
+        real_index = self.visual_to_real_index.get(visual_index)
+        if real_index is None:
             messagebox.showwarning("Errore", "Indice del passo non valido.", parent=self)
             return
         
-        real_index = self.visual_to_real_index[visual_index]
-        
         # Check if it's a repeat step
         step = self.workout_steps[real_index]
-        if 'repeat' in step and 'steps' in step:
+        if isinstance(step, dict) and 'repeat' in step and 'steps' in step:
             # It's a repeat step, edit it with RepeatDialog
             iterations = step['repeat']
             steps = step['steps']
@@ -2235,21 +2374,14 @@ class WorkoutEditor(tk.Toplevel):
                 # Update the repeat step with correct structure
                 self.workout_steps[real_index] = {'repeat': new_iterations, 'steps': new_steps}
                 
-                # Reload the steps
-                self.load_steps()
+                # Aggiorna solo la riga modificata
+                self.refresh_rows(visual_index, visual_index)
         else:
             # Regular step
-            if isinstance(step, dict):
-                step_type = list(step.keys())[0]
+            if isinstance(step, dict) and len(step) == 1:
+                step_type = next(iter(step))
                 step_detail = step[step_type]
                 
-                # Handle case where step_detail is a list (old format)
-                if isinstance(step_detail, list):
-                    messagebox.showinfo("Formato non supportato", 
-                                       f"Questo passo ha un formato vecchio che non può essere modificato direttamente.\n"
-                                       f"Ti suggeriamo di eliminarlo e ricrearlo.", parent=self)
-                    return
-                
                 dialog = StepDialog(self, step_type, step_detail, sport_type=self.sport_type)
                 
                 if dialog.result:
@@ -2258,8 +2390,8 @@ class WorkoutEditor(tk.Toplevel):
                     # Update the step
                     self.workout_steps[real_index] = {new_type: new_detail}
                     
-                    # Reload the steps
-                    self.load_steps()
+                    # Aggiorna solo la riga modificata
+                    self.refresh_rows(visual_index, visual_index)
             else:
                 # Handle completely unsupported format
                 messagebox.showinfo("Formato non supportato", 
@@ -2275,14 +2407,18 @@ class WorkoutEditor(tk.Toplevel):
             messagebox.showwarning("Nessuna selezione", "Seleziona un passo da rimuovere", parent=self)
             return
         
-        # Get the selected step index
-        item = selection[0]
-        item_values = self.steps_tree.item(item, "values")
-        index = int(item_values[0]) - 1
+        # Get the selected step index (the iid is the displayed index)
+        visual_index = int(selection[0])
+        
+        # Converti l'indice visualizzato in indice reale, saltando i metadati
+        real_index = self.visual_to_real_index.get(visual_index)
+        if real_index is None:
+            messagebox.showwarning("Errore", "Indice del passo non valido.", parent=self)
+            return
         
         # Remove the step
-        self.workout_steps.pop(index)
-        self.load_steps()
+        self.workout_steps.pop(real_index)
+        self.remove_row(visual_index)
         
     def move_step_up(self):
         """Move the selected step up in the list"""
@@ -2294,51 +2430,37 @@ class WorkoutEditor(tk.Toplevel):
             
         # Get the selected step visual index
         item = selection[0]
-        item_values = self.steps_tree.item(item, "values")
-        visual_index = int(item_values[0]) - 1  # -1 perché gli indici visualizzati partono da 1
+        visual_index = int(item) - 1  # -1 perché gli indici visualizzati (iid) partono da 1
         
         # Converti in indice reale
-        if not hasattr(self, 'visual_to_real_index') or visual_index + 1 not in self.visual_to_real_index:
+        real_index = self.visual_to_real_index.get(visual_index + 1)
+        if real_index is None:
             messagebox.showwarning("Errore", "Indice del passo non valido.", parent=self)
             return
-            
-        real_index = self.visual_to_real_index[visual_index + 1]
-        
-        # Impossibile spostare il primo elemento in alto
-        if real_index == 0:
-            return
-            
-        # Trova l'indice reale precedente (che non sia un metadato)
-        metadata_keys = ["sport_type", "date"]
-        prev_real_index = real_index - 1
         
-        while prev_real_index >= 0:
-            prev_step = self.workout_steps[prev_real_index]
-            if not (isinstance(prev_step, dict) and len(prev_step) == 1 and list(prev_step.keys())[0] in metadata_keys):
-                # Trovato il precedente step visibile
-                break
-            prev_real_index -= 1
+        # Indice reale del passo visibile precedente (i metadati sono già esclusi dalla mappa)
+        prev_real_index = self.visual_to_real_index.get(visual_index)
         
-        if prev_real_index < 0:
-            # Non c'è un elemento precedente valido
+        if prev_real_index is None:
+            # Impossibile spostare il primo elemento in alto
             return
         
         # Swap steps
         self.workout_steps[real_index], self.workout_steps[prev_real_index] = \
             self.workout_steps[prev_real_index], self.workout_steps[real_index]
             
-        # Reload the steps
-        self.load_steps()
+        # Aggiorna solo le due righe scambiate
+        self.refresh_rows(visual_index, visual_index + 1)
         
         # Try to select the moved item
         try:
             new_visual_index = visual_index - 1
             if new_visual_index >= 0:
-                new_item = self.steps_tree.get_children()[new_visual_index]
+                new_item = self._iids[new_visual_index]
                 self.steps_tree.selection_set(new_item)
                 self.steps_tree.see(new_item)
         except Exception as e:
-            print(f"Errore nella selezione dell'elemento: {str(e)}")
+            logging.debug("Errore nella selezione dell'elemento: %s", e)
     
     def move_step_down(self):
         """Move the selected step down in the list"""
@@ -2350,52 +2472,37 @@ class WorkoutEditor(tk.Toplevel):
             
         # Get the selected step visual index
         item = selection[0]
-        item_values = self.steps_tree.item(item, "values")
-        visual_index = int(item_values[0]) - 1  # -1 perché gli indici visualizzati partono da 1
+        visual_index = int(item) - 1  # -1 perché gli indici visualizzati (iid) partono da 1
         
         # Converti in indice reale
-        if not hasattr(self, 'visual_to_real_index') or visual_index + 1 not in self.visual_to_real_index:
+        real_index = self.visual_to_real_index.get(visual_index + 1)
+        if real_index is None:
             messagebox.showwarning("Errore", "Indice del passo non valido.", parent=self)
             return
-            
-        real_index = self.visual_to_real_index[visual_index + 1]
-        
-        # Impossibile spostare l'ultimo elemento più in basso
-        if real_index >= len(self.workout_steps) - 1:
-            return
-            
-        # Trova l'indice reale successivo (che non sia un metadato)
-        metadata_keys = ["sport_type", "date"]
-        next_real_index = real_index + 1
         
-        while next_real_index < len(self.workout_steps):
-            next_step = self.workout_steps[next_real_index]
-            if not (isinstance(next_step, dict) and len(next_step) == 1 and list(next_step.keys())[0] in metadata_keys):
-                # Trovato il successivo step visibile
-                break
-            next_real_index += 1
+        # Indice reale del passo visibile successivo (i metadati sono già esclusi dalla mappa)
+        next_real_index = self.visual_to_real_index.get(visual_index + 2)
         
-        if next_real_index >= len(self.workout_steps):
-            # Non c'è un elemento successivo valido
+        if next_real_index is None:
+            # Impossibile spostare l'ultimo elemento più in basso
             return
         
         # Swap steps
         self.workout_steps[real_index], self.workout_steps[next_real_index] = \
             self.workout_steps[next_real_index], self.workout_steps[real_index]
             
-        # Reload the steps
-        self.load_steps()
+        # Aggiorna solo le due righe scambiate
+        self.refresh_rows(visual_index + 1, visual_index + 2)
         
         # Try to select the moved item
         try:
             new_visual_index = visual_index + 1
-            children = self.steps_tree.get_children()
-            if new_visual_index < len(children):
-                new_item = children[new_visual_index]
+            if new_visual_index < len(self._iids):
+                new_item = self._iids[new_visual_index]
                 self.steps_tree.selection_set(new_item)
                 self.steps_tree.see(new_item)
         except Exception as e:
-            print(f"Errore nella selezione dell'elemento: {str(e)}")
+            logging.debug("Errore nella selezione dell'elemento: %s", e)
     
     def on_step_double_click(self, event):
         """Handle double-click on a step"""
@@ -2404,7 +2511,7 @@ class WorkoutEditor(tk.Toplevel):
     def on_step_select(self, event):
         """Handle step selection"""
         # Update the canvas to highlight the selected step
-        self.draw_workout()
+        self.schedule_redraw()
     
     def on_save(self):
         """Handle Save button click"""
@@ -2442,8 +2549,7 @@ class WorkoutEditor(tk.Toplevel):
         # Add the actual workout steps (filtering out any existing metadata)
         for step in self.workout_steps:
             # Skip metadata steps
-            if not (isinstance(step, dict) and len(step) == 1 and 
-                  ('sport_type' in step or 'date' in step)):
+            if not is_metadata_step(step):
                 final_steps.append(step)
         
         # Set the result - now includes sport type and possibly date
@@ -2500,8 +2606,23 @@ def add_workout_editor_tab(notebook, parent):
     workout_tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
     scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
     
-    # Store workouts in memory
-    workouts = []
+    # Store workouts in memory, by name (the name is also the iid of the row in workout_tree)
+    workouts = {}
+    
+    # Tipo di sport di ogni allenamento, ricavato dai passi quando ne viene creata la riga
+    workout_sports = {}
+    
+    # Caricamento da file in corso: numero dell'ultimo avviato e finestra di attesa
+    loading = {'generation': 0, 'dialog': None}
+    
+    def unique_workout_name(name):
+        """Return the name, adding a numeric suffix if another workout already uses it"""
+        candidate = name
+        counter = 2
+        while candidate in workouts:
+            candidate = f"{name} ({counter})"
+            counter += 1
+        return candidate
     
     def load_workouts_from_file():
         """Load workouts from a YAML file"""
@@ -2513,49 +2634,94 @@ def add_workout_editor_tab(notebook, parent):
         if not filename:
             return
         
-        try:
-            with open(filename, 'r', encoding='utf-8') as f:
-                data = yaml.safe_load(f)
-                
-                # Clear existing workouts
-                workouts.clear()
-                
-                # Extract config data if available
-                global workout_config
-                if 'config' in data:
-                    workout_config.update(data['config'])
+        # Un risultato arrivato dopo l'avvio di un caricamento più recente viene scartato
+        loading['generation'] += 1
+        generation = loading['generation']
+        if loading['dialog'] is not None:
+            loading['dialog'].destroy()
+            loading['dialog'] = None
+        
+        def parse_file():
+            # Eseguito in un thread separato: solo lettura e normalizzazione, nessuna chiamata a Tk
+            try:
+                data = load_yaml_file(filename)
                 
                 # Extract workouts
+                loaded = {}
                 for key, value in data.items():
                     if key != 'config' and isinstance(value, list):
-                        # Process the workout steps to handle repeat formats
-                        processed_steps = []
-                        for step in value:
-                            # Check if this is a repeat step
-                            if isinstance(step, dict) and len(step) == 1 and list(step.keys())[0].startswith('repeat'):
-                                repeat_key = list(step.keys())[0]
-                                # Extract number of iterations
-                                iterations = int(repeat_key.split(' ')[1].rstrip(':'))
-                                # Get the substeps
-                                substeps = step[repeat_key]
-                                # Create the repeat step in the expected format
-                                repeat_step = {'repeat': iterations, 'steps': substeps}
-                                processed_steps.append(repeat_step)
-                            else:
-                                processed_steps.append(step)
-                        
-                        workouts.append((key, processed_steps))
-                
-                # Update the treeview
-                load_workouts_to_tree()
-                
-                messagebox.showinfo("Successo", f"Caricati {len(workouts)} allenamenti dal file", parent=parent)
+                        # Converte i formati "repeat N:" e le liste del formato vecchio una volta sola,
+                        # così l'editor lavora sempre su passi con dettaglio testuale
+                        loaded[key] = normalize_steps(value)
                 
-        except Exception as e:
-            messagebox.showerror("Errore", f"Errore nel caricamento del file: {str(e)}", parent=parent)
+                parent.after(0, apply_loaded, data.get('config'), loaded)
+            except Exception as e:
+                parent.after(0, show_load_error, str(e))
+        
+        def finish_loading():
+            """Close the progress window; return False if a newer load has started meanwhile"""
+            if generation != loading['generation']:
+                return False
+            if loading['dialog'] is not None:
+                loading['dialog'].grab_release()
+                loading['dialog'].destroy()
+                loading['dialog'] = None
+            return True
+        
+        def apply_loaded(config, loaded):
+            # Di nuovo sul thread di Tk: aggiorna configurazione, dizionario e albero
+            if not finish_loading():
+                return
+            
+            # Extract config data if available
+            global workout_config
+            if config is not None:
+                workout_config.update(config)
+                freeze_workout_config()
+            
+            # Clear existing workouts
+            workouts.clear()
+            
+            # Il nome è l'iid della riga, e Tk restituisce gli iid come stringhe: chiavi YAML
+            # come 1 o 2024-05-01 vanno convertite, e un nome vuoto non è un iid valido
+            for key, steps in loaded.items():
+                workouts[unique_workout_name(str(key) or "Allenamento senza nome")] = steps
+            
+            # Update the treeview
+            load_workouts_to_tree()
+            
+            messagebox.showinfo("Successo", f"Caricati {len(workouts)} allenamenti dal file", parent=parent)
+        
+        def show_load_error(error):
+            if not finish_loading():
+                return
+            messagebox.showerror("Errore", f"Errore nel caricamento del file: {error}", parent=parent)
+        
+        # Finestra modale durante il caricamento: blocca l'editor finché i dati non sono applicati
+        dialog = tk.Toplevel(parent)
+        dialog.title("Caricamento")
+        dialog.transient(parent)
+        dialog.resizable(False, False)
+        dialog.protocol("WM_DELETE_WINDOW", lambda: None)
+        
+        frame = ttk.Frame(dialog, padding=20)
+        frame.pack(fill=tk.BOTH, expand=True)
+        ttk.Label(frame, text=f"Caricamento di {os.path.basename(filename)}...").pack(pady=(0, 10))
+        progress = ttk.Progressbar(frame, mode="indeterminate", length=250)
+        progress.pack()
+        progress.start(10)
+        
+        center_on_screen(dialog)
+        dialog.grab_set()
+        loading['dialog'] = dialog
+        
+        # Il parsing di file grandi bloccherebbe l'interfaccia: lo si esegue in background
+        threading.Thread(target=parse_file, daemon=True).start()
     
     def save_workouts_to_file():
         """Save workouts to a YAML file"""
+        # Importato solo quando serve: il modulo delle licenze carica la crittografia
+        from planner.license_manager import LicenseManager
         if not LicenseManager.get_instance().check_feature_access("premium"):
             return
         if not workouts:
@@ -2572,72 +2738,68 @@ def add_workout_editor_tab(notebook, parent):
             return
         
         try:
-            # Create a dictionary with all workouts
-            data = {}
-            
-            # Add the config section
             global workout_config
-            data['config'] = workout_config
-            
-            # Add all workouts
-            for name, steps in workouts:
-                data[name] = steps
             
-            # Use NoAliasDumper to prevent YAML aliases
-            class NoAliasDumper(yaml.SafeDumper):
-                def ignore_aliases(self, data):
-                    return True
-            
-            # Write the file
+            # Write the file (NoAliasDumper prevents YAML aliases).
+            # Ogni allenamento è scritto come mappatura a sé: il risultato è lo stesso
+            # di un unico dump, senza costruire in memoria il testo dell'intero file
             with open(filename, 'w', encoding='utf-8') as f:
-                yaml.dump(data, f, default_flow_style=False, sort_keys=False, Dumper=NoAliasDumper)
+                yaml.dump({'config': workout_config}, f, default_flow_style=False, sort_keys=False, Dumper=NoAliasDumper)
+                for name, steps in workouts.items():
+                    yaml.dump({name: steps}, f, default_flow_style=False, sort_keys=False, Dumper=NoAliasDumper)
             
             messagebox.showinfo("Successo", f"Salvati {len(workouts)} allenamenti nel file", parent=parent)
             
         except Exception as e:
             messagebox.showerror("Errore", f"Errore nel salvataggio del file: {str(e)}", parent=parent)
     
+    def workout_row(name, steps):
+        """Return the treeview values of a workout (name, sport, date, number of steps) and record its sport type"""
+        # Estrai il tipo di sport e la data dagli step
+        sport_type = "running"  # Default a running
+        workout_date = ""  # Default a nessuna data
+        
+        # Log per debug
+        logging.debug("Loading workout: %s with steps: %s", name, steps)
+        
+        # In un solo passaggio: tipo di sport, data e numero dei passi effettivi (esclusi i metadati)
+        actual_steps_count = 0
+        for step in steps:
+            if isinstance(step, dict):
+                if 'sport_type' in step:
+                    sport_type = step['sport_type']
+                elif 'date' in step:
+                    workout_date = step['date']
+                    logging.debug("Found date in workout %s: %s", name, workout_date)
+            
+            # Verifica che non sia un passo di metadati
+            if not is_metadata_step(step):
+                actual_steps_count += 1
+        
+        # Il tipo di sport serve di nuovo quando l'allenamento viene aperto nell'editor
+        workout_sports[name] = sport_type
+        
+        # Formatta il tipo di sport per la visualizzazione
+        sport_display = SPORT_DISPLAY_NAMES.get(sport_type) or sport_type.capitalize()
+        
+        # Formatta il testo per il numero di passi
+        steps_text = f"{actual_steps_count} passo" if actual_steps_count == 1 else f"{actual_steps_count} passi"
+        
+        return (name, sport_display, workout_date, steps_text)
+    
     def load_workouts_to_tree():
         """Load workouts into the treeview"""
         # Clear existing items
-        for item in workout_tree.get_children():
-            workout_tree.delete(item)
+        children = workout_tree.get_children()
+        if children:
+            workout_tree.delete(*children)
+        workout_sports.clear()
         
-        # Add workouts to the tree
-        for name, steps in workouts:
-            # Estrai il tipo di sport e la data dagli step
-            sport_type = "running"  # Default a running
-            workout_date = ""  # Default a nessuna data
-            
-            # Log per debug
-            logging.debug(f"Loading workout: {name} with steps: {steps}")
-            
-            # Cerca il tipo di sport e la data nei passi
-            if steps and isinstance(steps, list):
-                for step in steps:
-                    if isinstance(step, dict):
-                        if 'sport_type' in step:
-                            sport_type = step['sport_type']
-                        elif 'date' in step:
-                            workout_date = step['date']
-                            logging.debug(f"Found date in workout {name}: {workout_date}")
-            
-            # Formatta il tipo di sport per la visualizzazione
-            sport_display = sport_type.capitalize()
-            
-            # Conta solo i passi effettivi, escludendo date e sport_type
-            actual_steps_count = 0
-            for step in steps:
-                # Verifica che non sia un passo di metadati
-                if not (isinstance(step, dict) and len(step) == 1 and
-                      ('sport_type' in step or 'date' in step)):
-                    actual_steps_count += 1
-            
-            # Formatta il testo per il numero di passi
-            steps_text = f"{actual_steps_count} passo" if actual_steps_count == 1 else f"{actual_steps_count} passi"
-            
-            # Aggiungi l'allenamento con il tipo di sport, la data e il conteggio corretto
-            workout_tree.insert("", "end", values=(name, sport_display, workout_date, steps_text))
+        # Aggiungi ogni allenamento con il tipo di sport, la data e il conteggio dei passi
+        with tree_frozen(workout_tree):
+            insert = workout_tree.insert
+            for name, steps in workouts.items():
+                insert("", "end", iid=name, values=workout_row(name, steps))
 
     
     def create_new_workout():
@@ -2652,18 +2814,20 @@ def add_workout_editor_tab(notebook, parent):
                 name, steps = result
                 sport_type = workout_config.get('sport_type', 'running')  # valore predefinito se non fornito
             
-            # Crea una copia profonda della lista dei passi
-            steps_copy = copy.deepcopy(steps)
+            # I passi restituiti dall'editor non sono condivisi con nessun altro:
+            # basta una copia della lista, l'unica cosa che viene modificata qui
+            steps_copy = list(steps)
             
             # Aggiungi lo sport_type come primo elemento se non è già presente
             if not (steps_copy and isinstance(steps_copy[0], dict) and 'sport_type' in steps_copy[0]):
                 steps_copy.insert(0, {'sport_type': sport_type})
             
             # Aggiungi alla lista degli allenamenti in memoria
-            workouts.append((name, steps_copy))
+            name = unique_workout_name(name)
+            workouts[name] = steps_copy
             
-            # Aggiorna la vista
-            load_workouts_to_tree()
+            # Aggiorna la vista aggiungendo solo la nuova riga
+            workout_tree.insert("", "end", iid=name, values=workout_row(name, steps_copy))
     
     def edit_selected_workout():
         """Edit the selected workout"""
@@ -2674,34 +2838,28 @@ def add_workout_editor_tab(notebook, parent):
             return
         
         try:
-            # Get the selected workout index
-            index = workout_tree.index(selection[0])
+            # Get the selected workout (the iid is the workout name)
+            name = selection[0]
             
-            # Verifica che l'indice sia valido
-            if index < 0 or index >= len(workouts):
-                logging.warning(f"Indice non valido: {index}, totale workouts: {len(workouts)}")
+            # Verifica che l'allenamento esista
+            if name not in workouts:
+                logging.warning(f"Allenamento non trovato: {name}, totale workouts: {len(workouts)}")
                 messagebox.showwarning("Errore", "Selezione non valida. Riprova.", parent=parent)
                 return
                 
-            name, steps = workouts[index]
+            steps = workouts[name]
             
-            # Estrai il tipo di sport e la data dagli step
-            sport_type = "running"  # Default a running
+            # Il tipo di sport è già stato ricavato dai passi quando è stata creata la riga
+            sport_type = workout_sports.get(name, "running")
             
             # Log per debug
             logging.debug(f"Editing workout steps: {steps}")
             
-            if steps and isinstance(steps, list):
-                for step in steps:
-                    if isinstance(step, dict) and 'sport_type' in step:
-                        sport_type = step['sport_type']
-                        break
-            
             # Ora possiamo accedere in sicurezza a name e sport_type
             logging.debug(f"Editing workout: {name} with sport type: {sport_type}")
             
             # Open the editor with the correct sport type and steps (including date metadata)
-            result = edit_workout(parent, name, copy.deepcopy(steps), sport_type)
+            result = edit_workout(parent, name, copy_steps(steps), sport_type)
             
             if result:
                 # Gestire il caso in cui result contiene anche sport_type
@@ -2715,8 +2873,26 @@ def add_workout_editor_tab(notebook, parent):
                 # La lista new_steps dovrebbe già includere metadata come sport_type e date
                 # in quanto gestito nel metodo on_save dell'editor
                 
-                workouts[index] = (new_name, new_steps)
-                load_workouts_to_tree()
+                # Aggiorna solo la riga dell'allenamento modificato
+                if new_name == name:
+                    # Salvato senza modifiche: la riga è già aggiornata
+                    if new_steps == steps:
+                        return
+                    workouts[name] = new_steps
+                    workout_tree.item(name, values=workout_row(name, new_steps))
+                else:
+                    # Rinomina mantenendo la posizione dell'allenamento nella lista
+                    new_name = unique_workout_name(new_name)
+                    renamed = [(new_name, new_steps) if key == name else (key, value)
+                               for key, value in workouts.items()]
+                    workouts.clear()
+                    workouts.update(renamed)
+                    
+                    # Il nome è l'iid della riga: sostituiscila nella stessa posizione
+                    del workout_sports[name]
+                    index = workout_tree.index(name)
+                    workout_tree.delete(name)
+                    workout_tree.insert("", index, iid=new_name, values=workout_row(new_name, new_steps))
         
         except Exception as e:
             logging.error(f"Errore durante la modifica dell'allenamento: {str(e)}")
@@ -2730,12 +2906,8 @@ def add_workout_editor_tab(notebook, parent):
             messagebox.showwarning("Nessuna selezione", "Seleziona uno o più allenamenti da eliminare", parent=parent)
             return
         
-        # Ottieni i nomi degli allenamenti selezionati
-        selected_workouts = []
-        for item in selection:
-            index = workout_tree.index(item)
-            name, _ = workouts[index]
-            selected_workouts.append(name)
+        # Ottieni i nomi degli allenamenti selezionati (l'iid è il nome)
+        selected_workouts = list(selection)
         
         # Conferma plurale o singolare in base al numero di selezioni
         if len(selected_workouts) == 1:
@@ -2752,15 +2924,11 @@ def add_workout_editor_tab(notebook, parent):
         if not messagebox.askyesno("Conferma", confirm_message, parent=parent):
             return
         
-        # Elimina gli allenamenti selezionati (dalla fine all'inizio per evitare problemi di indice)
-        indices = [workout_tree.index(item) for item in selection]
-        indices.sort(reverse=True)  # Ordina in ordine decrescente
-        
-        for index in indices:
-            workouts.pop(index)
-        
-        # Aggiorna la vista
-        load_workouts_to_tree()
+        # Elimina gli allenamenti selezionati
+        for name in selected_workouts:
+            del workouts[name]
+            del workout_sports[name]
+        workout_tree.delete(*selected_workouts)
     
     def edit_configuration():
         """Edit pace and heart rate configuration"""
@@ -2803,7 +2971,7 @@ def add_workout_editor_tab(notebook, parent):
             yaml_data['config'] = workout_config
             
             # Aggiungi tutti gli allenamenti
-            for name, steps in workouts:
+            for name, steps in workouts.items():
                 yaml_data[name] = steps
             
             # Converti i dati YAML in Excel